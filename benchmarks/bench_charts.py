@@ -0,0 +1,105 @@
+"""Report chart export: one to_image call per chart vs batches through one Kaleido session.
+
+Builds the ten charts of the PDF report (same kinds and sizes as the
+dashboard: bars per outlet, the category pie, grouped bars) from synthetic
+counts and renders them as PNG bytes three ways: "sequential" calls
+`plotly.io.to_image` for every chart, each call starting its own Chrome;
+"first batch" is the first `charts.ChartRenderer.render_bytes` call, which
+starts the session (the path of the dashboard and of report.py); "next batch"
+repeats it on the session that stays open. Every image must be a PNG.
+Kaleido needs Chrome (`plotly_get_chrome`); without it the benchmark says so
+and stops.
+
+    python benchmarks/bench_charts.py --rounds 3 --workers 1 2
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import pandas as pd  # noqa: E402
+import plotly.express as px  # noqa: E402
+import plotly.graph_objects as go  # noqa: E402
+import plotly.io as pio  # noqa: E402
+
+import charts  # noqa: E402
+
+MEDIA = ["TN", "C5N", "LN", "Clarin", "Infobae", "Pagina12"]
+NAMES = [
+    "titles_per_media", "category_distribution", "politics_percentage_count", "politics_percentage",
+    "milei_kicillof_percentage", "lla_fp_percentage", "economy_percentage_count", "economy_percentage",
+    "tragedy_percentage_count", "tragedy_percentage",
+]
+PNG = b"\x89PNG\r\n\x1a\n"
+
+
+def report_figures(seed=5):
+    """Return (name, figure) for the ten report charts, with random counts."""
+    rng = random.Random(seed)
+    df = pd.DataFrame({"News Media": MEDIA, "Titles": [rng.randint(500, 3000) for _ in MEDIA]})
+    figures = [("titles_per_media", px.bar(df, x="News Media", y="Titles", text="Titles", color="News Media"))]
+    figures.append(("category_distribution", px.pie(
+        names=["Politics", "Economy", "Tragedy", "Other"], values=[rng.randint(100, 900) for _ in range(4)],
+    )))
+    for topic in ("politics", "economy", "tragedy"):
+        counts = df.assign(Count=[rng.randint(50, 400) for _ in MEDIA])
+        counts["Percentage"] = counts["Count"] / counts["Titles"] * 100
+        figures.append((f"{topic}_percentage_count", px.bar(counts, x="News Media", y="Count", text="Count")))
+        figures.append((f"{topic}_percentage", px.bar(
+            counts, x="News Media", y="Percentage", text=counts["Percentage"].round(1), color="News Media",
+        )))
+    for name, (a, b) in (("milei_kicillof_percentage", ("Milei", "Kicillof")),
+                         ("lla_fp_percentage", ("La Libertad Avanza", "Fuerza Patria"))):
+        figures.append((name, go.Figure(data=[
+            go.Bar(name=label, x=MEDIA, y=[rng.uniform(0, 40) for _ in MEDIA], marker_color=color)
+            for label, color in ((a, "#6A0DAD"), (b, "#FFD700"))
+        ], layout={"barmode": "group"})))
+    figures.sort(key=lambda item: NAMES.index(item[0]))
+    return figures
+
+
+def check(figures, images):
+    for (name, _), data in zip(figures, images):
+        if not data.startswith(PNG):
+            raise SystemExit(f"{name} is not a PNG")
+
+
+def sequential(figures):
+    return [pio.to_image(fig, format="png") for _, fig in figures]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=3, help="sequential rounds (best is reported)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1], help="parallel renders in the session")
+    args = parser.parse_args()
+
+    figures = report_figures()
+    print(f"{'path':>26} {'seconds':>8} {'per chart':>10}")
+    try:
+        best = float("inf")
+        for _ in range(args.rounds):
+            start = time.perf_counter()
+            check(figures, sequential(figures))
+            best = min(best, time.perf_counter() - start)
+    except (RuntimeError, ValueError) as error:
+        # Kaleido missing, or installed without a Chrome to drive
+        print(f"cannot render charts here: {str(error).strip().splitlines()[0]}")
+        return
+    print(f"{'sequential':>26} {best:>8.2f} {best / len(figures):>10.3f}")
+
+    for workers in args.workers:
+        renderer = charts.ChartRenderer(workers=workers)
+        for path in ("first batch", "next batch"):
+            start = time.perf_counter()
+            check(figures, renderer.render_bytes([fig for _, fig in figures]))
+            seconds = time.perf_counter() - start
+            print(f"{f'{path} (workers={workers})':>26} {seconds:>8.2f} {seconds / len(figures):>10.3f}")
+        # Kaleido's session is a singleton: stop it before starting one with other workers
+        renderer.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Insert throughput: the original save_titles path vs data_base.TitleStore.
+
+Inserts the same synthetic titles, in batches the size of a scraped homepage,
+into two fresh temporary databases with the current schema and reports
+rows/sec for each path. The original path opens a connection, inserts one row
+per execute and commits for every batch; TitleStore reuses one WAL connection
+and inserts each batch with executemany in one transaction. Both paths
+normalize and cluster the new titles (see minhash.py) the same way.
+
+    python benchmarks/bench_db_insert.py --rows 100000 --batch 50
+"""
+import argparse
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from data_base import TitleStore  # noqa: E402
+from migrations import migrate  # noqa: E402
+from minhash import assign_clusters  # noqa: E402
+from normalize import fold_title, title_hash  # noqa: E402
+
+MEDIA = ["TN", "C5N", "LN", "Clarin"]
+
+
+def legacy_save_titles(db_path, news_media, titles):
+    """The original save_titles: connect, check the table, one execute per title, close."""
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'titles'")
+    media_id = cursor.execute("SELECT id FROM media WHERE name = ?", (news_media,)).fetchone()[0]
+    scraped_at = int(time.time())
+    last_id = cursor.execute("SELECT COALESCE(MAX(id), 0) FROM titles").fetchone()[0]
+    for t in titles:
+        cursor.execute(
+            "INSERT OR IGNORE INTO titles (media_id, title, title_hash, title_norm, scraped_at) VALUES (?, ?, ?, ?, ?)",
+            (media_id, t, title_hash(t), fold_title(t), scraped_at),
+        )
+    assign_clusters(conn, cursor.execute("SELECT id, title_norm FROM titles WHERE id > ? ORDER BY id", (last_id,)).fetchall())
+    conn.commit()
+    conn.close()
+
+
+def legacy_database(db_path):
+    """Create a database with the current schema and the default rollback journal."""
+    conn = sqlite3.connect(db_path)
+    migrate(conn)
+    conn.executemany("INSERT INTO media (name) VALUES (?)", ((m,) for m in MEDIA))
+    conn.commit()
+    conn.close()
+
+
+def batches(rows, size):
+    for start in range(0, rows, size):
+        media = MEDIA[(start // size) % len(MEDIA)]
+        yield media, [f"Titular sintético número {i} para medir inserciones" for i in range(start, min(start + size, rows))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--batch", type=int, default=50, help="titles per save call (one homepage)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_db = Path(tmp) / "legacy.db"
+        legacy_database(legacy_db)
+        start = time.perf_counter()
+        for media, titles in batches(args.rows, args.batch):
+            legacy_save_titles(legacy_db, media, titles)
+        legacy = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with TitleStore(Path(tmp) / "store.db") as store:
+            for media, titles in batches(args.rows, args.batch):
+                store.save(media, titles)
+        store_time = time.perf_counter() - start
+
+    print(f"{'path':>12} {'seconds':>9} {'rows/sec':>10}")
+    print(f"{'save_titles':>12} {legacy:>9.2f} {args.rows / legacy:>10.0f}")
+    print(f"{'TitleStore':>12} {store_time:>9.2f} {args.rows / store_time:>10.0f}")
+    print(f"speedup: {legacy / store_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
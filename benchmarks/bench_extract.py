@@ -0,0 +1,78 @@
+"""Parse time and peak memory of the headline extractor backends.
+
+Runs every backend in `extractors.EXTRACTORS` over the homepage fixtures in
+benchmarks/fixtures and checks that they find the same titles as the original
+BeautifulSoup walk. The shipped fixtures are hand-built pages that reproduce
+the markup of each outlet, repeated `--repeat` times to reach homepage sizes;
+snapshot the live homepages first (`check_profiles.py --fetch --update`,
+then `--repeat 1`) for figures representative of real pages.
+The "profile" rows use the outlet's extraction profile (see profiles.py).
+
+    python benchmarks/bench_extract.py --repeat 20
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from extractors import EXTRACTORS, extract_bs4, extract_fast  # noqa: E402
+from profiles import PROFILES  # noqa: E402
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+def load_fixtures(repeat):
+    """Read the fixtures, repeating their body `repeat` times to reach homepage sizes."""
+    pages = {}
+    for path in sorted(FIXTURES.glob("*.html")):
+        html = path.read_text(encoding="utf-8")
+        head, _, rest = html.partition("<body")
+        body, _, tail = rest.partition("</body>")
+        pages[path.stem] = head + ("<body" + body + "</body>") * repeat + tail
+    return pages
+
+
+def measure(extract, html, rounds):
+    """Return (best time in ms, peak traced memory in KiB) of `extract(html)`."""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        extract(html)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    extract(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best * 1000, peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20, help="copies of each fixture body per page")
+    parser.add_argument("--rounds", type=int, default=5, help="timed runs per backend (best is kept)")
+    args = parser.parse_args()
+
+    pages = load_fixtures(args.repeat)
+    print(f"{'fixture':>8} {'KiB':>6} {'backend':>8} {'titles':>7} {'time (ms)':>10} {'peak (KiB)':>11}")
+    for name, html in pages.items():
+        # The original walk keeps duplicates; every backend must match it once deduplicated
+        expected = list(dict.fromkeys(extract_bs4(html)))
+        for backend, extract in EXTRACTORS.items():
+            titles = extract(html)
+            if backend != "bs4" and titles != expected:
+                raise SystemExit(f"{backend} does not match bs4 on {name}")
+            ms, peak = measure(extract, html, args.rounds)
+            print(f"{name:>8} {len(html) // 1024:>6} {backend:>8} {len(titles):>7} {ms:>10.1f} {peak:>11.0f}")
+        # The outlet profile skips excluded subtrees, so it drops the junk titles too
+        outlet = {key.lower(): key for key in PROFILES}.get(name)
+        if outlet:
+            extract = lambda page: extract_fast(page, outlet)  # noqa: E731
+            ms, peak = measure(extract, html, args.rounds)
+            print(f"{name:>8} {len(html) // 1024:>6} {'profile':>8} {len(extract(html)):>7} {ms:>10.1f} {peak:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
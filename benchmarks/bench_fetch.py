@@ -0,0 +1,91 @@
+"""Wall-clock benchmark: sequential `requests.get` per outlet vs the FetchEngine.
+
+Every outlet is served by its own local HTTP server (its own host:port), with an
+artificial latency added to each response, so the numbers model N slow portals.
+
+    python benchmarks/bench_fetch.py --outlets 4 8 16 --latency 0.3
+"""
+import argparse
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import requests  # noqa: E402
+from fetcher import HEADERS, FetchEngine  # noqa: E402
+
+PAGE = ("<html><body>" + "<h2>Titular de prueba para el benchmark de descarga</h2>" * 200 + "</body></html>").encode()
+
+
+def make_handler(latency):
+    class Handler(BaseHTTPRequestHandler):
+        # HTTP/1.1 so the client can keep the connection alive
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(PAGE)))
+            self.end_headers()
+            self.wfile.write(PAGE)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def start_servers(count, latency):
+    """Start `count` local servers and return (servers, urls)."""
+    servers, urls = [], []
+    for _ in range(count):
+        server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(latency))
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        urls.append(f"http://127.0.0.1:{server.server_port}/")
+    return servers, urls
+
+
+def sequential(urls):
+    """The original path: one fresh `requests.get` per outlet, one after another."""
+    for url in urls:
+        requests.get(url, headers=HEADERS, timeout=10).text
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--outlets", type=int, nargs="+", default=[4, 8, 16])
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds added to every response")
+    parser.add_argument("--rounds", type=int, default=3, help="scrape rounds per measurement")
+    args = parser.parse_args()
+
+    print(f"{'outlets':>8} {'sequential (s)':>15} {'engine (s)':>11} {'speedup':>8}")
+    for count in args.outlets:
+        servers, urls = start_servers(count, args.latency)
+
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            sequential(urls)
+        seq = time.perf_counter() - start
+
+        # Rounds after the first reuse the warm keep-alive pools
+        with FetchEngine(max_concurrency=count, per_host=2, timeout=10) as engine:
+            start = time.perf_counter()
+            for _ in range(args.rounds):
+                pages = engine.fetch_all(urls)
+                assert all(pages.values())
+            eng = time.perf_counter() - start
+
+        print(f"{count:>8} {seq:>15.2f} {eng:>11.2f} {seq / eng:>7.1f}x")
+        for server in servers:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
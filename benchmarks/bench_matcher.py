@@ -0,0 +1,112 @@
+"""Keyword classification: the original per-word substring scans vs KeywordMatcher.
+
+Classifies the same synthetic titles with both and fails unless the category
+and keyword-group counts per outlet are identical. The matcher reads titles
+folded by normalize.fold_title (done once at insert time in the database);
+the "fold + match" row adds that cost back in. The synthetic titles have no
+accents, where both agree; check_matcher.py checks the labels title by title,
+accents included, in a few seconds.
+
+    python benchmarks/bench_matcher.py --titles 1000000
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import clear_stats as cs  # noqa: E402
+from normalize import fold_title  # noqa: E402
+
+MEDIA = ["TN", "C5N", "LN", "Clarin"]
+FILLER = [
+    "el", "la", "de", "en", "con", "por", "una", "nuevo", "tras", "según", "sobre", "qué", "cómo",
+    "Buenos Aires", "Córdoba", "Rosada", "hoy", "mañana", "semana", "video", "fotos", "jugadores",
+    "escuela", "vecinos", "barrio", "ruta", "clima", "lluvias", "partido de fútbol", "show",
+]
+
+
+def synthetic_titles(count, seed=1):
+    """Yield (media, title) pairs mixing filler words with category keywords and groups."""
+    rng = random.Random(seed)
+    keywords = cs.words_politics + cs.words_tragedy + cs.words_economy
+    keywords += [v.title() for variants in cs.keyword_groups.values() for v in variants]
+    for _ in range(count):
+        words = rng.choices(FILLER, k=rng.randint(6, 12))
+        for _ in range(rng.choice((0, 0, 1, 1, 2, 3))):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(keywords))
+        yield rng.choice(MEDIA), " ".join(words).capitalize()
+
+
+def legacy_counts(rows):
+    """The original classification loop of clear_stats.stats()."""
+    category_counts, keyword_counts = {}, {group: {} for group in cs.keyword_groups}
+    for media, title in rows:
+        title_upper = title.upper()
+        if media not in category_counts:
+            category_counts[media] = {"politics": 0, "tragedy": 0, "economy": 0}
+        if any(word.upper() in title_upper for word in cs.words_politics):
+            category_counts[media]["politics"] += 1
+        if any(word.upper() in title_upper for word in cs.words_tragedy):
+            category_counts[media]["tragedy"] += 1
+        if any(word.upper() in title_upper for word in cs.words_economy):
+            category_counts[media]["economy"] += 1
+        for group, variants in cs.keyword_groups.items():
+            if media not in keyword_counts[group]:
+                keyword_counts[group][media] = 0
+            if any(variant in title_upper for variant in variants):
+                keyword_counts[group][media] += 1
+    return category_counts, keyword_counts
+
+
+def matcher_counts(rows, matcher):
+    """The same counts with one KeywordMatcher pass per (folded) title."""
+    category_counts, keyword_counts = {}, {group: {} for group in cs.keyword_groups}
+    for media, title in rows:
+        if media not in category_counts:
+            category_counts[media] = {name: 0 for name in cs.categories}
+            for group in cs.keyword_groups:
+                keyword_counts[group][media] = 0
+        for label in matcher.match(title):
+            kind, _, name = label.partition(":")
+            if kind == "category":
+                category_counts[media][name] += 1
+            else:
+                keyword_counts[name][media] += 1
+    return category_counts, keyword_counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--titles", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rows = list(synthetic_titles(args.titles))
+    folded = [(media, fold_title(title)) for media, title in rows]
+
+    start = time.perf_counter()
+    expected = legacy_counts(rows)
+    legacy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    # Building the automaton is part of the cost
+    matcher = cs.build_matcher()
+    result = matcher_counts(folded, matcher)
+    compiled = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matcher_counts(((media, fold_title(title)) for media, title in rows), matcher)
+    with_fold = time.perf_counter() - start
+
+    if result != expected:
+        raise SystemExit(f"Counts differ:\n{expected}\n{result}")
+    print(f"{'path':>16} {'seconds':>9} {'titles/sec':>11}")
+    print(f"{'substring scans':>16} {legacy:>9.2f} {args.titles / legacy:>11.0f}")
+    print(f"{'KeywordMatcher':>16} {compiled:>9.2f} {args.titles / compiled:>11.0f}")
+    print(f"{'fold + match':>16} {with_fold:>9.2f} {args.titles / with_fold:>11.0f}")
+    print(f"speedup: {legacy / compiled:.1f}x, counts identical")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Near-duplicate clustering: insert-time overhead and lookup cost of MinHash/LSH.
+
+Inserts synthetic titles, in batches the size of a scraping run, into a
+temporary database. Every `--dup-every`-th title is an edited copy of an
+earlier one (a word dropped or replaced), like a story picked up again with
+small changes. Reports the insert throughput and the share of it spent
+clustering, the recall on the planted copies, and the latency of
+`minhash.find_similar` once the database is full.
+
+    python benchmarks/bench_minhash.py --rows 1000000
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import db  # noqa: E402
+import minhash  # noqa: E402
+from bench_matcher import FILLER, synthetic_titles  # noqa: E402
+from data_base import TitleStore  # noqa: E402
+from normalize import fold_title  # noqa: E402
+
+
+def edit(title, rng):
+    """Drop or replace one word of `title`."""
+    words = title.split()
+    i = rng.randrange(len(words))
+    if rng.random() < 0.5 and len(words) > 4:
+        del words[i]
+    else:
+        words[i] = rng.choice(FILLER)
+    return " ".join(words)
+
+
+def titles_with_copies(count, dup_every, seed=7):
+    """Yield (media, title, original title or None), numbering titles so they are distinct."""
+    rng = random.Random(seed)
+    originals = []
+    for i, (media, title) in enumerate(synthetic_titles(count, seed)):
+        if originals and i % dup_every == 0:
+            original = originals[rng.randrange(max(0, len(originals) - 1000), len(originals))]
+            yield rng.choice(["TN", "C5N", "LN", "Clarin"]), edit(original, rng), original
+        else:
+            title = f"{title} {i}"
+            originals.append(title)
+            yield media, title, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=200, help="titles per save (one scraping run)")
+    parser.add_argument("--dup-every", type=int, default=10)
+    parser.add_argument("--lookups", type=int, default=1000)
+    args = parser.parse_args()
+
+    # Time spent clustering inside TitleStore.save_many
+    clustering = [0.0]
+    assign_clusters = minhash.assign_clusters
+
+    def timed_assign(conn, rows):
+        start = time.perf_counter()
+        joined = assign_clusters(conn, rows)
+        clustering[0] += time.perf_counter() - start
+        return joined
+
+    minhash.assign_clusters = timed_assign
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "minhash.db"
+        planted = []
+        with TitleStore(db_path) as store:
+            start = time.perf_counter()
+            rows = titles_with_copies(args.rows, args.dup_every)
+            batch = {}
+            for index, (media, title, original) in enumerate(rows, 1):
+                batch.setdefault(media, []).append(title)
+                if original is not None:
+                    planted.append((title, original))
+                if index % args.batch == 0:
+                    store.save_many(batch)
+                    batch = {}
+            store.save_many(batch)
+            total = time.perf_counter() - start
+
+        database = db.get_database(db_path)
+        with database.read() as conn:
+            clusters = dict(conn.execute("SELECT title, cluster_id FROM titles"))
+            found = sum(
+                copy in clusters and clusters[copy] == clusters[original] for copy, original in planted
+            )
+            merged = conn.execute("SELECT COUNT(*) FROM titles WHERE cluster_id != id").fetchone()[0]
+
+            rng = random.Random(1)
+            texts = [fold_title(title) for _, title, _ in titles_with_copies(min(args.rows, 10_000), args.dup_every, seed=3)]
+            queries = rng.sample(texts, min(args.lookups, len(texts)))
+            start = time.perf_counter()
+            for text in queries:
+                minhash.find_similar(conn, text)
+            lookup = (time.perf_counter() - start) / len(queries)
+            size = conn.execute("SELECT COUNT(*) FROM title_lsh").fetchone()[0]
+        database.close()
+
+    print(f"rows: {args.rows}, insert: {args.rows / total:.0f} rows/sec, clustering: {clustering[0] / total:.0%} of the insert time")
+    print(f"planted copies found: {found}/{len(planted)} ({found / max(len(planted), 1):.1%}), titles merged: {merged}")
+    print(f"find_similar: {lookup * 1000:.2f} ms per lookup over {size} LSH rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""PDF reports: the two per-language calls vs one template-driven run for every language.
+
+Computes the report of a temporary database filled with synthetic titles and
+draws the nine charts it embeds as PNG images (bars, like the dashboard
+renders). Then builds the English and Spanish PDFs:
+
+- "two calls (A85)": `create_report_pdf_en` then `create_report_pdf_es`, each
+  decoding the images and computing the metrics again, with ReportLab's
+  default ASCII85 image streams (the original builders);
+- "two calls": the same calls with binary image streams;
+- "one run": `pdf_create.build_reports`, metrics computed and images decoded
+  once for both languages;
+- "workers=N": the same with the languages built in N processes.
+
+The binary paths must produce the same bytes (ReportLab runs in invariant
+mode, without timestamps).
+
+    python benchmarks/bench_pdf.py --rounds 5 --workers 2
+"""
+import argparse
+import io
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from PIL import Image, ImageDraw  # noqa: E402
+from reportlab import rl_config  # noqa: E402
+
+import clear_stats as cs  # noqa: E402
+import pdf_create as pc  # noqa: E402
+from bench_stats_memory import fill  # noqa: E402
+
+rl_config.invariant = 1
+# Configured before the first build, so the legacy run below can switch ASCII85 back on
+pc.load_reportlab()
+
+
+def draw_charts(seed=3):
+    """Return a bar chart PNG (700x500, Plotly's default export size) for every report image."""
+    rng = random.Random(seed)
+    images = {}
+    for name in pc.IMAGES:
+        image = Image.new("RGB", (700, 500), "white")
+        draw = ImageDraw.Draw(image)
+        for i in range(6):
+            top = rng.randint(60, 420)
+            draw.rectangle([80 + i * 100, top, 150 + i * 100, 450], fill=(rng.randint(80, 200), 13, 173))
+            draw.text((90 + i * 100, top - 15), f"{rng.uniform(0, 60):.1f}", fill="black")
+        draw.line([60, 450, 680, 450], fill="gray")
+        buffer = io.BytesIO()
+        image.save(buffer, "PNG")
+        images[name] = buffer.getvalue()
+    return images
+
+
+def two_calls(report, folder, images):
+    pc.create_report_pdf_en(report, folder / "en.pdf", images)
+    pc.create_report_pdf_es(report, folder / "es.pdf", images)
+    return {lang: (folder / f"{lang}.pdf").read_bytes() for lang in ("en", "es")}
+
+
+def best_of(rounds, function, *args):
+    best, result = float("inf"), None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--titles", type=int, default=20_000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        fill(folder / "report.db", args.titles)
+        report = cs.stats(folder / "report.db")
+        images = draw_charts()
+
+        rl_config.useA85 = 1
+        legacy, _ = best_of(args.rounds, two_calls, report, folder, images)
+        rl_config.useA85 = 0
+        results = [("two calls (A85)", legacy, None)]
+        results.append(("two calls", *best_of(args.rounds, two_calls, report, folder, images)))
+        results.append(("one run", *best_of(args.rounds, pc.build_reports, report, None, images)))
+        for workers in args.workers:
+            results.append((f"workers={workers}", *best_of(args.rounds, pc.build_reports, report, None, images, workers)))
+
+    expected = results[1][2]
+    print(f"{'path':>16} {'seconds':>8} {'speedup':>8}")
+    for path, seconds, pdfs in results:
+        if pdfs is not None and pdfs != expected:
+            raise SystemExit(f"{path} built different PDFs")
+        print(f"{path:>16} {seconds:>8.3f} {legacy / seconds:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
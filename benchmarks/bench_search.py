@@ -0,0 +1,89 @@
+"""Category and keyword-group counts: full scan with the matcher vs FTS5 queries.
+
+Fills a temporary database with synthetic titles and counts every label of
+`clear_stats.keyword_lists()` both ways. The scan classifies every title in
+Python; the index answers one query per label. The counts are compared
+instead of asserted equal: the matcher finds substrings ("ley" inside
+"leyenda") while the index matches whole words with accents folded, so a
+label can differ. Also times a few `search.search()` calls.
+
+    python benchmarks/bench_search.py --titles 200000
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import aggregates  # noqa: E402
+import clear_stats as cs  # noqa: E402
+import db  # noqa: E402
+import search  # noqa: E402
+from bench_matcher import synthetic_titles  # noqa: E402
+from data_base import TitleStore  # noqa: E402
+
+QUERIES = ["inflacion", "milei", "banco central", "infla*", "gobierno ley"]
+
+
+def fill(db_path, count, batch=20_000):
+    """Insert `count` synthetic titles (numbered so none is a duplicate)."""
+    with TitleStore(db_path) as store:
+        found = {}
+        for i, (media, title) in enumerate(synthetic_titles(count)):
+            found.setdefault(media, []).append(f"{title} ({i})")
+            if (i + 1) % batch == 0:
+                store.save_many(found)
+                found = {}
+        store.save_many(found)
+
+
+def best_of(rounds, function, *args):
+    best, result = float("inf"), None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--titles", type=int, default=200_000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "search.db"
+        fill(db_path, args.titles)
+        database = db.get_database(db_path)
+        keywords = cs.keyword_lists()
+        with database.read() as conn:
+            last = conn.execute("SELECT MAX(id) FROM titles").fetchone()[0]
+            scan, scanned = best_of(
+                args.rounds, aggregates.count_range, conn, cs.SCAN_QUERY, 0, last, cs.matcher.match
+            )
+            fts, indexed = best_of(args.rounds, search.keyword_counts, conn, keywords)
+
+        print(f"{'path':>10} {'seconds':>8}")
+        print(f"{'scan':>10} {scan:>8.3f}")
+        print(f"{'fts5':>10} {fts:>8.3f}")
+        print(f"speedup: {scan / fts:.1f}x\n")
+
+        print(f"{'label':>28} {'scan':>8} {'fts5':>8}")
+        medias = {media for media, _ in scanned}
+        for label in keywords:
+            a = sum(scanned.get((media, label), 0) for media in medias)
+            b = sum(indexed.get((media, label), 0) for media in medias)
+            print(f"{label:>28} {a:>8} {b:>8}")
+
+        print(f"\n{'query':>16} {'ms':>7} {'results':>8}")
+        for query in QUERIES:
+            seconds, results = best_of(args.rounds, search.search, query, None, None, 100, db_path)
+            print(f"{query:>16} {seconds * 1000:>7.2f} {len(results):>8}")
+        database.close()
+
+
+if __name__ == "__main__":
+    main()
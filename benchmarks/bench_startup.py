@@ -0,0 +1,101 @@
+"""Startup cost of every entry point, measured with python -X importtime.
+
+For each entry point, a fresh interpreter runs it under `-X importtime`:
+`scraping` and `report` are imported as modules (their main() is not run),
+and the dashboard, a Streamlit script, is run from top to bottom with
+Streamlit's AppTest, as a first page view would (the stats, the figures, the
+trends and the PDF section, so the imports done inside functions count too).
+Reports the import time (best of `--rounds`; for the dashboard, the imports
+of the script run only), the number of modules loaded (Streamlit's own
+included) and which heavy packages came with them, plus a wall time: `--help`
+for the command-line tools, the whole script run for the dashboard. `--top` lists the
+slowest imports of each entry point.
+
+    python benchmarks/bench_startup.py --rounds 5 --top 5 --db /tmp/noticias.db
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+# Packages worth loading only when the feature that needs them is used
+HEAVY = ["streamlit", "plotly", "pandas", "numpy", "pyarrow", "reportlab", "PIL", "kaleido", "requests", "bs4", "asyncio"]
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+# Written to stderr once the harness is loaded: only the imports after it are timed
+MARK = "-- run --"
+
+# The dashboard run: AppTest is imported first, then the script runs as a page view
+APP_RUN = f"""
+import sys, time
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file("app.py", default_timeout=600)
+print("{MARK}", file=sys.stderr, flush=True)
+start = time.perf_counter()
+app.run()
+print(time.perf_counter() - start)
+if app.exception:
+    sys.exit(app.exception[0].value)
+"""
+
+ENTRY_POINTS = {
+    "scraping.py": "import scraping",
+    "report.py": "import report",
+    "app.py": APP_RUN,
+}
+
+
+def importtime(code):
+    """Run `code` with -X importtime.
+    Returns:
+        tuple: The total import time in microseconds, module -> cumulative
+            microseconds for every module loaded, the same for the top-level
+            imports only, and what `code` printed."""
+    run = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], cwd=SRC, check=True, capture_output=True, text=True,
+    )
+    modules, top = {}, {}
+    for match in LINE.finditer(run.stderr):
+        cumulative, indent, name = int(match[2]), match[3], match[4]
+        modules[name] = cumulative
+        # Imports without indentation are the ones the interpreter and the code ran themselves
+        if len(indent) == 1 and match.start() > run.stderr.find(MARK):
+            top[name] = cumulative
+    return sum(top.values()), modules, top, run.stdout
+
+
+def help_time(script):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, script, "--help"], cwd=SRC, check=True, capture_output=True)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--top", type=int, default=0, help="list the N slowest top-level imports of every entry point")
+    parser.add_argument("--db", default=None, help="database the dashboard reads (default: $NOTICIAS_DB or noticias.db)")
+    args = parser.parse_args()
+    if args.db:
+        os.environ["NOTICIAS_DB"] = str(Path(args.db).resolve())
+
+    print(f"{'entry point':>12} {'imports (ms)':>13} {'modules':>8} {'wall (ms)':>10}  heavy packages loaded")
+    for entry, code in ENTRY_POINTS.items():
+        runs = [importtime(code) for _ in range(args.rounds)]
+        total, modules, top, _ = min(runs, key=lambda run: run[0])
+        heavy = [name for name in HEAVY if name in modules]
+        if entry == "app.py":
+            wall = min(float(run[3]) for run in runs)
+        else:
+            wall = min(help_time(entry) for _ in range(args.rounds))
+        print(f"{entry:>12} {total / 1000:>13.1f} {len(modules):>8} {wall * 1000:>10.0f}  {', '.join(heavy) or '-'}")
+        for name, cumulative in sorted(top.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"{'':>14}{name:<30} {cumulative / 1000:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
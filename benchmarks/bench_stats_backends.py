@@ -0,0 +1,51 @@
+"""Full-scan stats time of the pure-Python and pandas backends.
+
+Fills a temporary database with synthetic titles and times
+`clear_stats.stats(incremental=False, backend=...)` for each backend in
+`clear_stats.BACKENDS` (best of `--rounds`), failing unless every report is
+identical. Each backend first runs once untimed, which imports what it needs
+(pandas, pyarrow) and warms the page cache.
+
+    python benchmarks/bench_stats_backends.py --rows 100000 1000000
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import clear_stats as cs  # noqa: E402
+import db  # noqa: E402
+from bench_stats_memory import fill  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'backend':>8} {'seconds':>8} {'titles/sec':>11}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = Path(tmp) / "stats.db"
+            fill(db_path, rows)
+            expected = None
+            for backend in cs.BACKENDS:
+                cs.stats(db_path, incremental=False, backend=backend)
+                best = float("inf")
+                for _ in range(args.rounds):
+                    start = time.perf_counter()
+                    report = cs.stats(db_path, incremental=False, backend=backend)
+                    best = min(best, time.perf_counter() - start)
+                expected = expected or report
+                if report != expected or report["titles_per_media"] != expected["titles_per_media"]:
+                    raise SystemExit(f"The {backend} report differs on {rows} rows")
+                print(f"{rows:>9} {backend:>8} {best:>8.2f} {rows / best:>11.0f}")
+            db.get_database(db_path).close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Peak memory of the stats scan: fetchall() vs the chunked fetchmany pipeline.
+
+Fills temporary databases with synthetic titles and runs each path in a fresh
+Python process, so the peak resident set size (ru_maxrss) of every run belongs
+to that run alone. "fetchall" loads every title before classifying, like the
+original stats(); "stream" is `clear_stats.stats(incremental=False)` and
+"rebuild" the first incremental refresh, both reading `--chunk` rows at a time.
+Every path must produce the same counts.
+
+    python benchmarks/bench_stats_memory.py --rows 100000 300000 1000000
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+import aggregates  # noqa: E402
+import clear_stats as cs  # noqa: E402
+import db  # noqa: E402
+from data_base import TitleStore  # noqa: E402
+
+MEDIA = ["TN", "C5N", "LN", "Clarin"]
+PATHS = ["fetchall", "stream", "rebuild"]
+
+
+def fill(db_path, rows, batch=20_000):
+    """Insert `rows` distinct synthetic titles spread over the outlets."""
+    words = cs.words_politics + cs.words_tragedy + cs.words_economy + ["clima", "fútbol", "vecinos"]
+    with TitleStore(db_path) as store:
+        for start in range(0, rows, batch):
+            found = {media: [] for media in MEDIA}
+            for i in range(start, min(start + batch, rows)):
+                found[MEDIA[i % len(MEDIA)]].append(
+                    f"Titular {i}: {words[i % len(words)]} y {words[i * 7 % len(words)]} en la semana"
+                )
+            store.save_many(found)
+
+
+def run_path(path, db_path, chunk_size):
+    """Run one path in this process and return its totals."""
+    if path == "fetchall":
+        database = db.get_database(db_path)
+        with database.read() as conn:
+            rows = conn.execute("""
+                SELECT m.name, t.title_norm FROM titles t JOIN media m ON m.id = t.media_id ORDER BY t.id
+            """).fetchall()
+            report = cs._build_report(conn, aggregates.count_metrics(rows, cs.matcher.match))
+    else:
+        report = cs.stats(db_path, incremental=path == "rebuild", chunk_size=chunk_size)
+    return report["totals"]
+
+
+def measure(path, db_path, chunk_size):
+    """Run `path` in a child process; return (seconds, peak RSS in MiB, totals)."""
+    out = subprocess.run(
+        [sys.executable, __file__, "--child", path, str(db_path), "--chunk", str(chunk_size)],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(out.splitlines()[-1])
+
+
+def child(path, db_path, chunk_size):
+    start = time.perf_counter()
+    totals = run_path(path, db_path, chunk_size)
+    seconds = time.perf_counter() - start
+    # ru_maxrss is in KiB on Linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps([seconds, peak, totals]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[100_000, 300_000, 1_000_000])
+    parser.add_argument("--chunk", type=int, default=aggregates.CHUNK_SIZE, help="rows per fetchmany call")
+    parser.add_argument("--child", nargs=2, metavar=("PATH", "DB"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child[0], args.child[1], args.chunk)
+        return
+
+    print(f"{'rows':>9} {'path':>9} {'seconds':>8} {'peak RSS (MiB)':>15}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = Path(tmp) / "stats.db"
+            fill(db_path, rows)
+            db.get_database(db_path).close()
+            expected = None
+            for path in PATHS:
+                seconds, peak, totals = measure(path, db_path, args.chunk)
+                if expected is None:
+                    expected = totals
+                elif totals != expected:
+                    raise SystemExit(f"{path} totals differ on {rows} rows:\n{expected}\n{totals}")
+                print(f"{rows:>9} {path:>9} {seconds:>8.2f} {peak:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Scaling of the full stats scan with the number of worker processes.
+
+Fills a temporary database with synthetic titles and times
+`clear_stats.stats(incremental=False, workers=N)` for every N, checking that
+each report is identical to the serial one. The speedup is bounded by the
+number of cores of the machine (printed first).
+
+    python benchmarks/bench_stats_parallel.py --rows 1000000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import clear_stats as cs  # noqa: E402
+import db  # noqa: E402
+from bench_stats_memory import fill  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    print(f"cores: {os.cpu_count()}")
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = Path(tmp) / "stats.db"
+        fill(db_path, args.rows)
+        db.get_database(db_path).close()
+
+        expected = cs.stats(db_path, incremental=False)
+        serial = None
+        print(f"{'workers':>7} {'seconds':>8} {'titles/sec':>11} {'speedup':>8}")
+        for workers in args.workers:
+            start = time.perf_counter()
+            report = cs.stats(db_path, incremental=False, workers=workers)
+            seconds = time.perf_counter() - start
+            if report != expected or report["titles_per_media"] != expected["titles_per_media"]:
+                raise SystemExit(f"The report with {workers} workers differs from the serial one")
+            serial = serial or seconds
+            print(f"{workers:>7} {seconds:>8.2f} {args.rows / seconds:>11.0f} {serial / seconds:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
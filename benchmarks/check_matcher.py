@@ -0,0 +1,93 @@
+"""Check that KeywordMatcher finds exactly the labels of the original substring loop.
+
+Two contracts are checked, on hand-written edge cases (accents, case,
+overlapping keywords, keywords inside longer words, empty titles) and on
+`--titles` synthetic titles whose keywords get random accents and case:
+
+- `KeywordMatcher(keywords)` (str.upper fold) returns, for every title, the
+  labels for which `any(word.upper() in title.upper() for word in words)`,
+  the loop clear_stats.stats() used to run;
+- `clear_stats.matcher`, which reads folded titles (title_norm), returns the
+  labels for which `any(fold_title(word) in fold_title(title) ...)`: the same
+  loop, accent and case insensitive.
+
+Runs in a few seconds and exits with an error on the first difference.
+
+    python benchmarks/check_matcher.py --titles 20000
+"""
+import argparse
+import random
+import sys
+import unicodedata
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import clear_stats as cs  # noqa: E402
+from bench_matcher import synthetic_titles  # noqa: E402
+from matcher import KeywordMatcher  # noqa: E402
+from normalize import fold_title  # noqa: E402
+
+EDGE_CASES = [
+    "",
+    "   ",
+    "Milei",
+    "MILEI habló en Córdoba",
+    "Javier Milei y Axel Kicillof, cara a cara",
+    "javier mileí: acentos que el original no ignoraba",
+    "La Libertad Avanza y Fuerza Patria cierran listas",
+    "LA LIBERTAD AVANZA",
+    "la libertad  avanza (doble espacio)",
+    "Kirchnerismo, peronismo y kirchneristas",
+    "El dólar blue y la inflación de hoy",
+    "EL DÓLAR OFICIAL, LA INFLACIÓN Y EL FMI",
+    "El dolar sin tilde y la inflacion sin tilde",
+    "Política: el Congreso debate el presupuesto",
+    "POLITICA sin tilde",
+    "Tragedia en la ruta: un choque dejó heridos",
+    "Ñandú, pingüino y acción: caracteres especiales",
+    "Economi\u0301a y marcas combinantes sueltas\u0301\u0301",
+    "Política\u00a0con espacio duro",
+    "Un titular sin ninguna palabra clave",
+    "🔥 Milei 🔥",
+]
+
+
+def legacy_labels(folded_keywords, title, fold):
+    """The original loop: a label matches if any of its keywords is a substring of the title."""
+    text = fold(title)
+    return tuple(label for label, words in folded_keywords.items() if any(word in text for word in words))
+
+
+def vary(title, rng):
+    """Randomly add accents to vowels and change the case of `title`."""
+    accents = {"a": "á", "e": "é", "i": "í", "o": "ó", "u": "ú", "n": "ñ"}
+    chars = [accents.get(ch, ch) if rng.random() < 0.1 else ch for ch in title]
+    title = "".join(chars)
+    return rng.choice((title, title.upper(), title.lower(), unicodedata.normalize("NFD", title)))
+
+
+def check(name, keywords, matcher, fold, titles, prepare=lambda title: title):
+    folded_keywords = {label: [fold(word) for word in words] for label, words in keywords.items()}
+    for title in titles:
+        expected = legacy_labels(folded_keywords, title, fold)
+        found = matcher.match(prepare(title))
+        if found != expected:
+            sys.exit(f"{name}: {title!r}\n  substring loop: {expected}\n  KeywordMatcher: {found}")
+    print(f"{name}: {len(titles)} titles, labels identical")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--titles", type=int, default=20000, help="synthetic titles checked besides the edge cases")
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    titles = EDGE_CASES + [vary(title, rng) for _, title in synthetic_titles(args.titles)]
+    keywords = cs.keyword_lists()
+    check("str.upper matcher", keywords, KeywordMatcher(keywords), str.upper, titles)
+    check("clear_stats.matcher", keywords, cs.matcher, fold_title, titles, prepare=fold_title)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Check every outlet extraction profile against its stored homepage fixture.
+
+For each fixture in benchmarks/fixtures, the titles found with the outlet's
+profile must equal the ones listed in <fixture>.expected.txt, and a profile
+that finds no title fails. The report also shows how many titles the generic
+h1-h3 heuristic would have stored.
+
+The shipped fixtures are hand-built pages that reproduce the markup of each
+outlet. `--fetch` replaces them with snapshots of the live homepages (see
+`scraping.links`); review the titles found before accepting them.
+
+    python benchmarks/check_profiles.py                    # check
+    python benchmarks/check_profiles.py --fetch --update   # snapshot the homepages, accept the output
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from extractors import extract_fast  # noqa: E402
+from profiles import PROFILES  # noqa: E402
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+def fetch_fixtures():
+    """Save the current homepage of every outlet with a profile as its fixture."""
+    import scraping
+
+    for outlet, url in scraping.links.items():
+        if outlet not in PROFILES:
+            continue
+        html = scraping.get_html(url)
+        if html is None:
+            sys.exit(f"Could not fetch {url}: the fixture of {outlet} was not updated")
+        (FIXTURES / f"{outlet.lower()}.html").write_text(html, encoding="utf-8")
+        print(f"{outlet}: saved {len(html.encode('utf-8')) // 1024} KiB from {url}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--update", action="store_true", help="rewrite the expected titles")
+    parser.add_argument("--fetch", action="store_true", help="replace the fixtures with the live homepages first")
+    args = parser.parse_args()
+    if args.fetch:
+        fetch_fixtures()
+
+    outlets = {key.lower(): key for key in PROFILES}
+    failed = False
+    print(f"{'outlet':>8} {'generic':>8} {'profile':>8} {'status':>8}")
+    for path in sorted(FIXTURES.glob("*.html")):
+        outlet = outlets.get(path.stem)
+        if outlet is None:
+            continue
+        html = path.read_text(encoding="utf-8")
+        titles = extract_fast(html, outlet)
+        expected_path = path.with_suffix(".expected.txt")
+        if not titles:
+            # The scraper falls back to the generic rule, but the profile is broken
+            status = "EMPTY"
+            failed = True
+        elif args.update:
+            expected_path.write_text("\n".join(titles) + "\n", encoding="utf-8")
+            status = "updated"
+        else:
+            expected = expected_path.read_text(encoding="utf-8").splitlines()
+            status = "ok" if titles == expected else "FAILED"
+            if titles != expected:
+                failed = True
+                for title in sorted(set(titles) ^ set(expected)):
+                    print(f"  {'+' if title in titles else '-'} {title}")
+        print(f"{outlet:>8} {len(extract_fast(html)):>8} {len(titles):>8} {status:>8}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+import sqlite3
+from collections import Counter
+from datetime import date, timedelta
+from concurrent.futures import ProcessPoolExecutor
+from migrations import first_unclustered
+
+# Incremental per-day aggregates behind clear_stats.stats().
+# Only the titles added since the last refresh are classified; the report is
+# then read from the stats_daily table, whose size grows with days and
+# outlets instead of with the number of titles.
+
+# Rows read from SQLite per fetchmany call
+CHUNK_SIZE = 5000
+# Rowid ranges handed to each worker process in parallel mode, for load balance
+RANGES_PER_WORKER = 4
+# True for the first title of its story (cluster_id, see minhash.py) in its
+# outlet: the titles counted when counting unique stories, so a story counts
+# on the day it first appears in an outlet. `t` is the title.
+FIRST_OF_STORY = """NOT EXISTS (
+    SELECT 1 FROM titles p
+    WHERE p.cluster_id = t.cluster_id AND p.media_id = t.media_id AND p.id < t.id
+)"""
+# Period of a stats_daily day for each time-series granularity (weeks start on Monday)
+GRANULARITIES = {
+    "day": "s.day",
+    "week": "DATE(s.day, '-6 days', 'weekday 1')",
+    "month": "SUBSTR(s.day, 1, 7) || '-01'",
+}
+
+
+def iter_rows(cursor, chunk_size=CHUNK_SIZE):
+    """Yield the rows of `cursor`, reading `chunk_size` rows at a time.
+    Only one chunk is in memory at once, whatever the size of the table."""
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            return
+        yield from rows
+
+
+def count_metrics(rows, classify, counts=None):
+    """Count "total" and every metric of `classify(title)` for each key.
+    Args:
+        rows (iterable): (key, title) pairs, usually a stream from `iter_rows`.
+        classify (callable): title -> iterable of metric names for that title.
+        counts (Counter): Counter to add to (a new one by default).
+    Returns:
+        Counter: (key, metric) -> count, keys in order of first appearance."""
+    counts = Counter() if counts is None else counts
+    for key, title in rows:
+        counts[key, "total"] += 1
+        for metric in classify(title):
+            counts[key, metric] += 1
+    return counts
+
+
+def count_range(conn, query, first, last, classify, width=1, chunk_size=CHUNK_SIZE):
+    """Classify the rows of `query` for the titles with first < id <= last.
+    Args:
+        conn (sqlite3.Connection): A connection to the database.
+        query (str): SQL taking (first, last) and returning the key columns
+            followed by the title, in id order.
+        first (int): Exclusive lower rowid bound.
+        last (int): Inclusive upper rowid bound.
+        classify (callable): title -> iterable of metric names for that title.
+        width (int): Number of key columns (a single column is used as is,
+            several are grouped in a tuple).
+        chunk_size (int): Rows read per fetchmany call.
+    Returns:
+        Counter: (key, metric) -> count."""
+    rows = iter_rows(conn.execute(query, (first, last)), chunk_size)
+    if width == 1:
+        keyed = ((key, title) for key, title in rows)
+    else:
+        keyed = ((row[:width], row[width]) for row in rows)
+    return count_metrics(keyed, classify)
+
+
+_worker = {}
+
+
+def _init_worker(db_path, classify):
+    # One read-only connection and one classifier per worker process
+    _worker["conn"] = sqlite3.connect(f"{db_path.as_uri()}?mode=ro", uri=True)
+    _worker["classify"] = classify
+
+
+def _count_worker(query, first, last, width, chunk_size):
+    return count_range(_worker["conn"], query, first, last, _worker["classify"], width, chunk_size)
+
+
+def split_range(first, last, parts):
+    """Split the rowid range (first, last] into at most `parts` (first, last] ranges."""
+    step = max(1, -(-(last - first) // parts))
+    return [(lo, min(lo + step, last)) for lo in range(first, last, step)]
+
+
+def count_parallel(db_path, query, first, last, classify, width=1, chunk_size=CHUNK_SIZE, workers=2):
+    """Same as `count_range`, classifying rowid ranges in a pool of `workers` processes.
+    Each worker opens its own read-only connection to `db_path` and the partial
+    counts are merged in rowid order, so the result (keys in order of first
+    appearance included) is identical to the serial one.
+    Args:
+        db_path (Path): The database file.
+        classify (callable): Must be picklable: a module-level function, or the
+            `match` of a KeywordMatcher whose fold is None or module-level
+            (str.upper), not a lambda.
+        workers (int): Number of worker processes.
+        (the rest as in `count_range`)
+    Returns:
+        Counter: (key, metric) -> count."""
+    ranges = split_range(first, last, workers * RANGES_PER_WORKER)
+    counts = Counter()
+    if not ranges:
+        return counts
+    with ProcessPoolExecutor(min(workers, len(ranges)), initializer=_init_worker, initargs=(db_path, classify)) as pool:
+        partials = pool.map(
+            _count_worker,
+            *zip(*((query, lo, hi, width, chunk_size) for lo, hi in ranges)),
+        )
+        for partial in partials:
+            counts.update(partial)
+    return counts
+
+
+def refresh(database, classify, fingerprint, chunk_size=CHUNK_SIZE, workers=1):
+    """Classify the titles added since the last refresh and add them to stats_daily.
+    Args:
+        database (db.Database): The database to update (through its writer).
+        classify (callable): title_norm -> iterable of metric names for that title.
+        fingerprint (str): Identifies the keyword lists. When it changes, the
+            aggregates are rebuilt from scratch.
+        chunk_size (int): Rows read per fetchmany call.
+        workers (int): Classify in this many processes (see `count_parallel`).
+    Returns:
+        int: The number of titles classified."""
+    with database.write_lock:
+        conn = database.writer()
+        conn.execute("BEGIN IMMEDIATE")
+        with conn:
+            state = conn.execute("SELECT last_rowid, fingerprint FROM stats_state WHERE id = 1").fetchone()
+            last_rowid = 0
+            if state and state[1] == fingerprint:
+                last_rowid = state[0]
+            else:
+                conn.execute("DELETE FROM stats_daily")
+
+            # The write lock is held, so no title can appear past this mark meanwhile
+            high_water = conn.execute("SELECT COALESCE(MAX(id), 0) FROM titles").fetchone()[0]
+            # Titles still waiting for their story are counted once they have one
+            unclustered = first_unclustered(conn)
+            if unclustered is not None:
+                high_water = max(min(high_water, unclustered - 1), last_rowid)
+                database.backfill()
+            query = f"""
+                SELECT DATE(t.scraped_at, 'unixepoch', 'localtime'), t.media_id, {FIRST_OF_STORY}, t.title_norm
+                FROM titles t
+                WHERE t.id > ? AND t.id <= ?
+                ORDER BY t.id
+            """
+            if workers > 1:
+                counts = count_parallel(database.path, query, last_rowid, high_water, classify, 3, chunk_size, workers)
+            else:
+                counts = count_range(conn, query, last_rowid, high_water, classify, 3, chunk_size)
+
+            # n counts every title, n_unique only the first title of each story
+            daily = {}
+            for ((day, media_id, first), metric), n in counts.items():
+                row = daily.setdefault((day, media_id, metric), [0, 0])
+                row[0] += n
+                row[1] += n if first else 0
+            conn.executemany("""
+                INSERT INTO stats_daily (day, media_id, metric, n, n_unique) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (day, media_id, metric) DO UPDATE SET
+                    n = n + excluded.n,
+                    n_unique = n_unique + excluded.n_unique
+            """, ((*key, n, n_unique) for key, (n, n_unique) in daily.items()))
+            conn.execute("""
+                INSERT INTO stats_state (id, last_rowid, fingerprint) VALUES (1, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET last_rowid = excluded.last_rowid, fingerprint = excluded.fingerprint
+            """, (high_water, fingerprint))
+    return sum(n for (_, metric), n in counts.items() if metric == "total")
+
+
+def day_key(value):
+    """Return a window bound as a stats_daily day ("YYYY-MM-DD"), or None.
+    Args:
+        value (str | date | datetime | None): The bound; strings must be ISO dates."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = date.fromisoformat(value[:10])
+    return value.isoformat()[:10]
+
+
+def _window(start, end):
+    """Return the WHERE clause and parameters selecting the days start <= day <= end."""
+    clauses, params = [], []
+    if start is not None:
+        clauses.append("s.day >= ?")
+        params.append(day_key(start))
+    if end is not None:
+        clauses.append("s.day <= ?")
+        params.append(day_key(end))
+    return (f"WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+
+def totals(conn, start=None, end=None, unique=False):
+    """Return {(media name, metric): count} summed over the days of a window, with the media in id order.
+    Days are the primary key of stats_daily, so a window is an index range sum.
+    Args:
+        conn (sqlite3.Connection): A connection to the database.
+        start (str | date): First day of the window (all the history if None).
+        end (str | date): Last day of the window, included (up to today if None).
+        unique (bool): Count stories (near-duplicate titles once per outlet) instead of titles."""
+    where, params = _window(start, end)
+    rows = conn.execute(f"""
+        SELECT m.name, s.metric, SUM(s.{"n_unique" if unique else "n"})
+        FROM stats_daily s JOIN media m ON m.id = s.media_id
+        {where}
+        GROUP BY s.media_id, s.metric
+        ORDER BY s.media_id
+    """, params)
+    return {(media, metric): n for media, metric, n in rows}
+
+
+def day_range(conn, start=None, end=None):
+    """Return the first and last day ("YYYY-MM-DD") with titles inside a window, or (None, None)."""
+    where, params = _window(start, end)
+    return conn.execute(f"SELECT MIN(s.day), MAX(s.day) FROM stats_daily s {where}", params).fetchone()
+
+
+def series(conn, granularity="day", start=None, end=None, unique=False):
+    """Return the counts of every period of a window.
+    Args:
+        conn (sqlite3.Connection): A connection to the database.
+        granularity (str): "day", "week" or "month".
+        start (str | date): First day of the window.
+        end (str | date): Last day of the window, included.
+        unique (bool): Count stories instead of titles (see `totals`).
+    Returns:
+        dict: (period, media name, metric) -> count, where a period is the ISO
+            date of its first day. Periods without titles are missing."""
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown granularity {granularity!r}, choose one of: {', '.join(GRANULARITIES)}")
+    where, params = _window(start, end)
+    rows = conn.execute(f"""
+        SELECT {GRANULARITIES[granularity]} AS period, m.name, s.metric, SUM(s.{"n_unique" if unique else "n"})
+        FROM stats_daily s JOIN media m ON m.id = s.media_id
+        {where}
+        GROUP BY period, s.media_id, s.metric
+        ORDER BY period, s.media_id
+    """, params)
+    return {(period, media, metric): n for period, media, metric, n in rows}
+
+
+def periods(first, last, granularity="day"):
+    """Return every period (ISO date of its first day) from `first` to `last`, both periods included."""
+    if first is None or last is None:
+        return []
+    current, last = date.fromisoformat(first), date.fromisoformat(last)
+    result = []
+    while current <= last:
+        result.append(current.isoformat())
+        if granularity == "month":
+            current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+        else:
+            current += timedelta(days=7 if granularity == "week" else 1)
+    return result
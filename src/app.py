@@ -1,15 +1,10 @@
 import streamlit as st
 import plotly.express as px
-import plotly.graph_objects as go
 import clear_stats as cs
 import pandas as pd
 import pdf_create as pc
-from pathlib import Path
-
-project_root = Path(__file__).resolve().parent.parent
-img_root = project_root / "resource" / "img"
-pdf_root = project_root / "resource" / "pdf"
-img_root.mkdir(parents=True, exist_ok=True)
+import charts
+import search
 
 # Set the page layout to wide mode
 st.set_page_config(layout="wide")
@@ -20,13 +15,16 @@ def get_stats():
     return cs.stats()
 
 report = get_stats()
+# The charts of the PDF report, shared with the headless report command
+figures = charts.report_figures(report)
+
+# Time series of the whole history, read from the daily aggregates
+@st.cache_data
+def get_series(granularity):
+    return cs.stats(granularity=granularity)["series"]
+
 # Define a consistent color map for all news media
-color_map = {
-    'TN': '#6A0DAD',      # Dark Violet
-    'C5N': '#9370DB',     # Medium Violet
-    'LN': '#B8A4E3',      # Light Violet
-    'Clarin': '#8F7FBF'   # Slate Blue (similar to violet)
-}
+color_map = charts.COLOR_MAP
 
 # -----------------
 # General Overview (Full width)
@@ -69,19 +67,7 @@ col_chart1, col_chart2 = st.columns([0.6, 0.4])
 
 # Bar chart: Titles per media
 with col_chart1:
-    titles_per_media = report["titles_per_media"]
-    medias = [m for m, _ in titles_per_media]
-    counts = [c for _, c in titles_per_media]
-
-    fig_bar = px.bar(
-        x=medias,
-        y=counts,
-        title="Number of Titles per Media",
-        labels={"x": "News Media", "y": "Titles"},
-        color=medias, # Use 'medias' as the color variable
-        color_discrete_map=color_map # Apply the custom color map
-    )
-    fig_bar.write_image(str(img_root/"titles_per_media.png"))  # Save the figure as an image
+    fig_bar = figures["titles_per_media"]
     st.plotly_chart(fig_bar, use_container_width=True)
 
 # Pie chart: Category distribution
@@ -114,16 +100,12 @@ with col_chart2:
         hole=0.3,
         color_discrete_sequence= pie_colors
     )
-    fig_pie.write_image(str(img_root/"category_distribution.png"))  # Save the figure as an image
     st.plotly_chart(fig_pie, use_container_width=True)
 
 # --------------------------
 # Detailed Analysis per Category
 # --------------------------
 
-# Convert titles_per_media to a dictionary for easier lookup
-total_titles_per_media_dict = dict(report["titles_per_media"])
-
 # Politics Section
 st.markdown("---")
 col_pol_title, _ = st.columns([1, 10])
@@ -133,20 +115,8 @@ with col_pol_title:
 # Create two columns for the charts
 col_pol_chart1, col_pol_chart2 = st.columns(2)
 
-category_counts = report["category_counts_per_media"]
-medias = list(category_counts.keys())
-
 # Calculate percentages
-politics_percentages = {}
-for media in medias:
-    total_titles = total_titles_per_media_dict.get(media, 0)
-    if total_titles > 0:
-        percentage = (category_counts[media]["politics"] / total_titles) * 100
-        politics_percentages[media] = percentage
-    else:
-        politics_percentages[media] = 0
-        
-politics_counts = [category_counts[m]["politics"] for m in medias]
+politics_percentages = charts.category_percentages(report, "politics")
 
 # Find the media with the highest percentage
 dominant_media_pol = "N/A"
@@ -155,28 +125,11 @@ if politics_percentages:
 
 # Display charts in their respective columns
 with col_pol_chart1:
-    fig_pol_count = px.bar(
-        x=medias,
-        y=politics_counts,
-        title="Politics Titles per Media (Count)",
-        labels={"x": "News Media", "y": "Politics Titles"},
-        color=medias, # Use 'medias' as the color variable
-        color_discrete_map=color_map # Apply the custom color map
-    )
-    fig_pol_count.write_image(str(img_root/"politics_percentage_count.png"))  # Save the figure as an image
+    fig_pol_count = figures["politics_percentage_count"]
     st.plotly_chart(fig_pol_count, use_container_width=True)
 
 with col_pol_chart2:
-    fig_pol_percent = px.bar(
-        x=medias,
-        y=[politics_percentages[m] for m in medias],
-        title="Politics Titles per Media (Percentage)",
-        labels={"x": "News Media", "y": "Percentage (%)"},
-        text_auto=".1f",
-        color=medias, # Use 'medias' as the color variable
-        color_discrete_map=color_map # Apply the custom color map
-    )
-    fig_pol_percent.write_image(str(img_root/"politics_percentage.png"))  # Save the figure as an image
+    fig_pol_percent = figures["politics_percentage"]
     st.plotly_chart(fig_pol_percent, use_container_width=True)
 
 # Display text below the charts
@@ -190,68 +143,15 @@ st.write(
 st.markdown("---")
 st.subheader("Political Figures and Parties")
 
-# Prepare data for new charts
-keyword_counts = report["specific_keywords_counts"]
-df_milei_kicillof = pd.DataFrame({
-    'News Media': medias,
-    'Milei': [
-        keyword_counts.get('JAVIER MILEI', {}).get(m, 0) +
-        keyword_counts.get('MILEI', {}).get(m, 0)
-        for m in medias
-    ],
-    'Kicillof': [
-        keyword_counts.get('AXEL KICILLOF', {}).get(m, 0) +
-        keyword_counts.get('KICILLOF', {}).get(m, 0)
-        for m in medias
-    ]
-})
-
-
-df_lla_fp = pd.DataFrame({
-    'News Media': medias,
-    'La Libertad Avanza': [
-        keyword_counts.get('LA LIBERTAD AVANZA', {}).get(m, 0) for m in medias
-    ],
-    'Fuerza Patria': [
-        keyword_counts.get('FUERZA PATRIA', {}).get(m, 0) +
-        keyword_counts.get('PERONISMO', {}).get(m, 0) +
-        keyword_counts.get('KIRCHNERISMO', {}).get(m, 0) +
-        keyword_counts.get('KIRCHNERISTAS', {}).get(m, 0) +
-        keyword_counts.get('KIRCHNERISTA', {}).get(m, 0) +
-        keyword_counts.get("PERONISTA", {}).get(m, 0) +
-        keyword_counts.get("PERONISTAS", {}).get(m, 0)
-        for m in medias
-    ]
-})
-
-# Calculate percentages for the charts
-df_milei_kicillof['Total'] = df_milei_kicillof['Milei'] + df_milei_kicillof['Kicillof']
-df_milei_kicillof['Milei (%)'] = (df_milei_kicillof['Milei'] / df_milei_kicillof['Total']) * 100
-df_milei_kicillof['Kicillof (%)'] = (df_milei_kicillof['Kicillof'] / df_milei_kicillof['Total']) * 100
-
-df_lla_fp['Total'] = df_lla_fp['La Libertad Avanza'] + df_lla_fp['Fuerza Patria']
-df_lla_fp['La Libertad Avanza (%)'] = (df_lla_fp['La Libertad Avanza'] / df_lla_fp['Total']) * 100
-df_lla_fp['Fuerza Patria (%)'] = (df_lla_fp['Fuerza Patria'] / df_lla_fp['Total']) * 100
-
 # Create two columns for the new charts
 col_pol_keywords1, col_pol_keywords2 = st.columns(2)
 
 with col_pol_keywords1:
-    fig_milei_kicillof = go.Figure(data=[
-        go.Bar(name='Milei', x=df_milei_kicillof['News Media'], y=df_milei_kicillof['Milei (%)'], text=df_milei_kicillof['Milei (%)'].round(1), textposition='auto', marker_color='#6A0DAD'),
-        go.Bar(name='Kicillof', x=df_milei_kicillof['News Media'], y=df_milei_kicillof['Kicillof (%)'], text=df_milei_kicillof['Kicillof (%)'].round(1), textposition='auto', marker_color='#FFD700')
-    ])
-    fig_milei_kicillof.update_layout(barmode='group', title="Milei vs Kicillof by Media (Percentage)")
-    fig_milei_kicillof.write_image(str(img_root/"milei_kicillof_percentage.png"))  # Save the figure as an image
+    fig_milei_kicillof = figures["milei_kicillof_percentage"]
     st.plotly_chart(fig_milei_kicillof, use_container_width=True)
     
 with col_pol_keywords2:
-    fig_lla_fp = go.Figure(data=[
-        go.Bar(name='La Libertad Avanza', x=df_lla_fp['News Media'], y=df_lla_fp['La Libertad Avanza (%)'], text=df_lla_fp['La Libertad Avanza (%)'].round(1), textposition='auto', marker_color='#6A0DAD'),
-        go.Bar(name='Fuerza Patria', x=df_lla_fp['News Media'], y=df_lla_fp['Fuerza Patria (%)'], text=df_lla_fp['Fuerza Patria (%)'].round(1), textposition='auto', marker_color='#FFD700')
-    ])
-    fig_lla_fp.update_layout(barmode='group', title="La Libertad Avanza vs Fuerza Patria by Media (Percentage)")
-    fig_lla_fp.write_image(str(img_root/"lla_fp_percentage.png"))  # Save the figure as an image
+    fig_lla_fp = figures["lla_fp_percentage"]
     st.plotly_chart(fig_lla_fp, use_container_width=True)
 
 
@@ -265,16 +165,7 @@ with col_eco_title:
 col_eco_chart1, col_eco_chart2 = st.columns(2)
 
 # Calculate percentages
-economy_percentages = {}
-for media in medias:
-    total_titles = total_titles_per_media_dict.get(media, 0)
-    if total_titles > 0:
-        percentage = (category_counts[media]["economy"] / total_titles) * 100
-        economy_percentages[media] = percentage
-    else:
-        economy_percentages[media] = 0
-
-economy_counts = [category_counts[m]["economy"] for m in medias]
+economy_percentages = charts.category_percentages(report, "economy")
 
 # Find the media with the highest percentage
 dominant_media_eco = "N/A"
@@ -283,28 +174,11 @@ if economy_percentages:
 
 # Display charts in their respective columns
 with col_eco_chart1:
-    fig_eco_count = px.bar(
-        x=medias,
-        y=economy_counts,
-        title="Economy Titles per Media (Count)",
-        labels={"x": "News Media", "y": "Economy Titles"},
-        color=medias, # Use 'medias' as the color variable
-        color_discrete_map=color_map # Apply the custom color map
-    )
-    fig_eco_count.write_image(str(img_root/"economy_percentage_count.png"))  # Save the figure as an image
+    fig_eco_count = figures["economy_percentage_count"]
     st.plotly_chart(fig_eco_count, use_container_width=True)
 
 with col_eco_chart2:
-    fig_eco_percent = px.bar(
-        x=medias,
-        y=[economy_percentages[m] for m in medias],
-        title="Economy Titles per Media (Percentage)",
-        labels={"x": "News Media", "y": "Percentage (%)"},
-        text_auto=".1f",
-        color=medias, # Use 'medias' as the color variable
-        color_discrete_map=color_map # Apply the custom color map
-    )
-    fig_eco_percent.write_image(str(img_root/"economy_percentage.png")) # Save the figure as an image
+    fig_eco_percent = figures["economy_percentage"]
     st.plotly_chart(fig_eco_percent, use_container_width=True)
 
 # Display text below the charts
@@ -324,16 +198,7 @@ with col_tra_title:
 col_tra_chart1, col_tra_chart2 = st.columns(2)
 
 # Calculate percentages
-tragedy_percentages = {}
-for media in medias:
-    total_titles = total_titles_per_media_dict.get(media, 0)
-    if total_titles > 0:
-        percentage = (category_counts[media]["tragedy"] / total_titles) * 100
-        tragedy_percentages[media] = percentage
-    else:
-        tragedy_percentages[media] = 0
-
-tragedy_counts = [category_counts[m]["tragedy"] for m in medias]
+tragedy_percentages = charts.category_percentages(report, "tragedy")
 
 # Find the media with the highest percentage
 dominant_media_tra = "N/A"
@@ -342,28 +207,11 @@ if tragedy_percentages:
 
 # Display charts in their respective columns
 with col_tra_chart1:
-    fig_tra_count = px.bar(
-        x=medias,
-        y=tragedy_counts,
-        title="Tragedy Titles per Media (Count)",
-        labels={"x": "News Media", "y": "Tragedy Titles"},
-        color=medias, # Use 'medias' as the color variable
-        color_discrete_map=color_map # Apply the custom color map
-    )
-    fig_tra_count.write_image(str(img_root/"tragedy_percentage_count.png"))  # Save the figure as an image
+    fig_tra_count = figures["tragedy_percentage_count"]
     st.plotly_chart(fig_tra_count, use_container_width=True)
 
 with col_tra_chart2:
-    fig_tra_percent = px.bar(
-        x=medias,
-        y=[tragedy_percentages[m] for m in medias],
-        title="Tragedy Titles per Media (Percentage)",
-        labels={"x": "News Media", "y": "Percentage (%)"},
-        text_auto=".1f",
-        color=medias, # Use 'medias' as the color variable
-        color_discrete_map=color_map # Apply the custom color map
-    )
-    fig_tra_percent.write_image(str(img_root/"tragedy_percentage.png"))  # Save the figure as an image
+    fig_tra_percent = figures["tragedy_percentage"]
     st.plotly_chart(fig_tra_percent, use_container_width=True)
 
 # Display text below the charts
@@ -373,30 +221,106 @@ st.write(
     """
 )
 
-# PDF Generation Section
-pc.create_report_pdf_en(report)
-pc.create_report_pdf_es(report)
+# Trends Section
 st.markdown("---")
-file_path1 = str(pdf_root/"Scraping-Report-en.pdf")
-file_path2 = str(pdf_root/"Scraping-Report-es.pdf")
+st.subheader("Trends")
+
+col_trend_options1, col_trend_options2, col_trend_options3 = st.columns(3)
+with col_trend_options1:
+    granularity = st.selectbox("Granularity", ["day", "week", "month"], format_func=str.capitalize)
+with col_trend_options2:
+    topics = {"Titles": ("titles", None)}
+    topics.update({name.capitalize(): ("categories", name) for name in cs.categories})
+    topics.update({group.title(): ("keywords", group) for group in cs.keyword_groups})
+    topic = st.selectbox("Topic", list(topics))
+with col_trend_options3:
+    rolling_window = st.slider("Rolling average (periods)", min_value=1, max_value=14, value=1)
+
+series = get_series(granularity)
+kind, key = topics[topic]
+values = series[kind] if key is None else series[kind][key]
+df_trend = pd.DataFrame(values, index=pd.to_datetime(series["periods"]))
+# Smooth each outlet with a rolling mean over the last periods
+df_trend = df_trend.rolling(rolling_window, min_periods=1).mean()
+
+fig_trend = px.line(
+    df_trend,
+    title=f"{topic} per {granularity.capitalize()} by Media",
+    labels={"index": "Date", "value": "Titles", "variable": "News Media"},
+    color_discrete_map=color_map
+)
+st.plotly_chart(fig_trend, use_container_width=True)
 
-with open(file_path1, "rb") as f:
-    file_bytes1 = f.read()
+# Search Section
+st.markdown("---")
+st.subheader("Search Headlines")
+
+col_search1, col_search2, col_search3 = st.columns([2, 1, 1])
+with col_search1:
+    query = st.text_input("Words to look for (accents are optional, use * for prefixes: infla*)")
+with col_search2:
+    search_media = st.multiselect("News Media", list(color_map))
+with col_search3:
+    search_dates = st.date_input("Dates", value=())
+
+if query:
+    # A single picked date is a one-day range
+    date_range = (tuple(search_dates) * 2)[:2] if search_dates else None
+    results = search.search(query, media=search_media, date_range=date_range, limit=200)
+    st.write(f"**{len(results)}** headlines found (best matches first, up to 200)")
+    if results:
+        st.dataframe(pd.DataFrame(results), use_container_width=True, hide_index=True)
 
-with open(file_path2, "rb") as f:
-    file_bytes2 = f.read()
+# PDF Generation Section
+st.markdown("---")
 
 st.write("By clicking on the button you can download a PDF with the analysis carried out on this page")
 
-st.download_button(
-    label="Download PDF Report (English)",
-    data=file_bytes1,
-    file_name="Scraping-Report-en.pdf",
-    mime="application/pdf"
-)
-st.download_button(
-    label="Download PDF Report (Spanish)",
-    data=file_bytes2,
-    file_name="Scraping-Report-es.pdf",
-    mime="application/pdf"
-)
\ No newline at end of file
+# The reports, once every chart image is rendered
+def pdf_downloads():
+    errors = [future.exception() for future in chart_images.values() if future.exception() is not None]
+    if errors:
+        st.warning(f"The PDF report is not available right now: the charts could not be rendered. {errors[0]}")
+        return
+    images = {name: future.result() for name, future in chart_images.items()}
+    # Built in memory, only when the report or its charts changed, otherwise served from the cache
+    pdfs = pc.report_pdfs(report, ["en", "es"], images, cache_dir=None if charts.IN_MEMORY else pc.CACHE_DIR)
+    st.download_button(
+        label="Download PDF Report (English)",
+        data=pdfs["en"],
+        file_name="Scraping-Report-en.pdf",
+        mime="application/pdf"
+    )
+    st.download_button(
+        label="Download PDF Report (Spanish)",
+        data=pdfs["es"],
+        file_name="Scraping-Report-es.pdf",
+        mime="application/pdf"
+    )
+
+# The chart images render in the background: the page never waits for them.
+# Until they are done, only this section reruns, every few seconds.
+@st.fragment(run_every=2)
+def pdf_pending():
+    if all(future.done() for future in chart_images.values()):
+        st.rerun()
+    st.info("Preparing the PDF report...")
+
+# The chart images are rendered (Kaleido) and the reports built (ReportLab) only once the user asks for them
+if st.button("Prepare PDF Report"):
+    # Every click starts over, so the charts that failed to render are tried again
+    st.session_state["pdf_images"] = {}
+if "pdf_images" in st.session_state:
+    # PNG images of the report charts, rendered in the background, once per figure.
+    # The renders of this session are kept by figure hash: a failure is shown, not retried on every rerun
+    requested = st.session_state["pdf_images"]
+    chart_images = {}
+    for name, fig in figures.items():
+        key = charts.figure_key(fig)
+        if requested.get(name, (None,))[0] != key:
+            requested[name] = (key, charts.image(fig))
+        chart_images[name] = requested[name][1]
+    if all(future.done() for future in chart_images.values()):
+        pdf_downloads()
+    else:
+        pdf_pending()
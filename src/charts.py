@@ -0,0 +1,386 @@
+import atexit
+import contextlib
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+# Plotly (and the pandas it uses) and Kaleido are imported by the functions that use them, so a
+# process that only serves cached images (or `report.py --help`) never loads them.
+
+project_root = Path(__file__).resolve().parent.parent
+CACHE_DIR = project_root / "resource" / "cache" / "charts"
+# NOTICIAS_IN_MEMORY=1 keeps the dashboard's charts and PDF reports off the disk
+IN_MEMORY = os.environ.get("NOTICIAS_IN_MEMORY") == "1"
+# Rendered images kept in memory by an exporter (a few KB each)
+MAX_IMAGES = 64
+# Rendered images kept in the cache folder, the least recently used are removed
+MAX_CACHED_IMAGES = 256
+
+# A consistent color for every news media
+COLOR_MAP = {
+    'TN': '#6A0DAD',      # Dark Violet
+    'C5N': '#9370DB',     # Medium Violet
+    'LN': '#B8A4E3',      # Light Violet
+    'Clarin': '#8F7FBF'   # Slate Blue (similar to violet)
+}
+# Keywords counted for each side of the political figures and parties charts
+FIGURES = {
+    'Milei': ['JAVIER MILEI', 'MILEI'],
+    'Kicillof': ['AXEL KICILLOF', 'KICILLOF'],
+}
+PARTIES = {
+    'La Libertad Avanza': ['LA LIBERTAD AVANZA'],
+    'Fuerza Patria': [
+        'FUERZA PATRIA', 'PERONISMO', 'KIRCHNERISMO', 'KIRCHNERISTAS', 'KIRCHNERISTA', 'PERONISTA', 'PERONISTAS',
+    ],
+}
+
+
+def figure_key(fig):
+    """Return the content hash of a Plotly figure (its data and layout)."""
+    return hashlib.sha256(fig.to_json().encode("utf-8")).hexdigest()
+
+
+def category_percentages(report, category):
+    """Return the share of every media's titles that belong to `category`.
+    Args:
+        report (dict): As returned by clear_stats.stats().
+        category (str): "politics", "economy" or "tragedy".
+    Returns:
+        dict: media -> percentage (0 for a media without titles)."""
+    titles_per_media = dict(report["titles_per_media"])
+    percentages = {}
+    for media, counts in report["category_counts_per_media"].items():
+        total_titles = titles_per_media.get(media, 0)
+        percentages[media] = (counts[category] / total_titles) * 100 if total_titles > 0 else 0
+    return percentages
+
+
+def _versus(report, medias, sides, title):
+    """Grouped bars of the share of each side in the keyword mentions of every media."""
+    import numpy as np
+    import plotly.graph_objects as go
+
+    keyword_counts = report["specific_keywords_counts"]
+    counts = {
+        side: [sum(keyword_counts.get(keyword, {}).get(m, 0) for keyword in keywords) for m in medias]
+        for side, keywords in sides.items()
+    }
+    totals = np.array([sum(media_counts) for media_counts in zip(*counts.values())])
+    bars = []
+    for side, color in zip(sides, ['#6A0DAD', '#FFD700']):
+        # A float64 array, which Plotly stores as a typed array: the figure (and
+        # its image hash) is the same as with the DataFrame columns. A media
+        # without mentions gets NaN, so no bar.
+        with np.errstate(invalid="ignore"):
+            y = np.array(counts[side]) / totals * 100
+        bars.append(go.Bar(
+            name=side, x=list(medias), y=y, text=y.round(1), textposition='auto', marker_color=color,
+        ))
+    fig = go.Figure(data=bars)
+    fig.update_layout(barmode='group', title=title)
+    return fig
+
+
+def report_figures(report):
+    """Build the charts of the PDF report, the same ones the dashboard shows.
+    Args:
+        report (dict): As returned by clear_stats.stats().
+    Returns:
+        dict: image name (see pdf_create.IMAGES) -> plotly.graph_objects.Figure."""
+    import plotly.express as px
+
+    medias = [m for m, _ in report["titles_per_media"]]
+    figures = {"titles_per_media": px.bar(
+        x=medias,
+        y=[c for _, c in report["titles_per_media"]],
+        title="Number of Titles per Media",
+        labels={"x": "News Media", "y": "Titles"},
+        color=medias,
+        color_discrete_map=COLOR_MAP,
+    )}
+    category_counts = report["category_counts_per_media"]
+    medias = list(category_counts.keys())
+    for category in ("politics", "economy", "tragedy"):
+        name = category.capitalize()
+        percentages = category_percentages(report, category)
+        figures[f"{category}_percentage_count"] = px.bar(
+            x=medias,
+            y=[category_counts[m][category] for m in medias],
+            title=f"{name} Titles per Media (Count)",
+            labels={"x": "News Media", "y": f"{name} Titles"},
+            color=medias,
+            color_discrete_map=COLOR_MAP,
+        )
+        figures[f"{category}_percentage"] = px.bar(
+            x=medias,
+            y=[percentages[m] for m in medias],
+            title=f"{name} Titles per Media (Percentage)",
+            labels={"x": "News Media", "y": "Percentage (%)"},
+            text_auto=".1f",
+            color=medias,
+            color_discrete_map=COLOR_MAP,
+        )
+    figures["milei_kicillof_percentage"] = _versus(report, medias, FIGURES, "Milei vs Kicillof by Media (Percentage)")
+    figures["lla_fp_percentage"] = _versus(
+        report, medias, PARTIES, "La Libertad Avanza vs Fuerza Patria by Media (Percentage)"
+    )
+    return figures
+
+
+def write_atomic(data, target):
+    """Write `data` to `target` atomically, so readers never see half a file.
+    Args:
+        data (bytes): The file contents.
+        target (Path): The file written."""
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, target)
+
+
+def read_cached(path):
+    """Return the bytes of a cached file, or None if it is not there (or was just pruned).
+    The file is touched, so `prune_cache` keeps the files in use."""
+    try:
+        data = path.read_bytes()
+        os.utime(path)
+    except FileNotFoundError:
+        return None
+    return data
+
+
+def prune_cache(folder, pattern, keep):
+    """Delete the least recently used files of a cache folder past the newest `keep`.
+    Args:
+        folder (Path): The cache folder.
+        pattern (str): The files of the cache, e.g. "*.png".
+        keep (int): How many files are kept."""
+    files = []
+    for path in Path(folder).glob(pattern):
+        try:
+            files.append((path.stat().st_mtime, path))
+        except FileNotFoundError:
+            continue
+    files.sort(reverse=True)
+    for _, path in files[keep:]:
+        # Another process may prune the same folder
+        path.unlink(missing_ok=True)
+
+
+class ChartRenderer:
+    """Renders figures to bytes through one long-lived Kaleido session.
+
+    `fig.write_image` starts a headless Chrome for every image, and Kaleido's
+    sync server runs one call at a time. The renderer keeps its own session
+    instead: an event loop in a background thread holding a Kaleido with
+    `workers` tabs. The figures of a batch are sent together, each call takes
+    a free tab, and the images come back as bytes, so nothing is written to
+    disk. Chrome is looked up before the session starts: without it the
+    session would hang instead of failing, so a RuntimeError is raised instead.
+    Args:
+        workers (int): Charts rendered in parallel (browser tabs) by the session."""
+
+    def __init__(self, workers=1):
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._loop = None
+        self._session = None
+        self._kaleido = None
+
+    def _start(self):
+        if self._session is None:
+            import asyncio
+            from choreographer.browsers.chromium import Chromium
+
+            if not Chromium.find_browser(skip_local=False):
+                raise RuntimeError(
+                    "Kaleido requires Google Chrome to be installed. Install it from your terminal with: plotly_get_chrome"
+                )
+            self._loop = asyncio.new_event_loop()
+            threading.Thread(target=self._loop.run_forever, name="kaleido", daemon=True).start()
+            try:
+                self._session = self._run(self._open())
+            except BaseException:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._loop = None
+                raise
+            atexit.register(self.close)
+
+    def _run(self, coroutine):
+        import asyncio
+
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    async def _open(self):
+        import kaleido
+        import plotly.io as pio
+
+        # The session is opened and closed on the loop's thread, as Kaleido requires
+        session = contextlib.AsyncExitStack()
+        options = {"n": self.workers}
+        if pio.defaults.plotlyjs:
+            options["plotlyjs"] = pio.defaults.plotlyjs
+        if pio.defaults.mathjax:
+            options["mathjax"] = pio.defaults.mathjax
+        self._kaleido = await session.enter_async_context(kaleido.Kaleido(**options))
+        return session
+
+    async def _calc(self, figures, opts):
+        import asyncio
+        import plotly.io as pio
+
+        return await asyncio.gather(*(
+            self._kaleido.calc_fig(fig, opts=dict(opts), topojson=pio.defaults.topojson) for fig in figures
+        ))
+
+    def render_bytes(self, figures, format="png"):
+        """Render figures in one batch and return their images.
+        Args:
+            figures (list): plotly.graph_objects.Figure objects.
+            format (str): The image format.
+        Returns:
+            list: The image of every figure, as bytes."""
+        import plotly.io as pio
+
+        figures = [fig.to_dict() for fig in figures]
+        if not figures:
+            return []
+        # The size and scale plotly.io.to_image uses by default
+        opts = {
+            "format": format,
+            "width": pio.defaults.default_width,
+            "height": pio.defaults.default_height,
+            "scale": pio.defaults.default_scale,
+        }
+        with self._lock:
+            self._start()
+        return self._run(self._calc(figures, opts))
+
+    def close(self):
+        """Stop the Kaleido session (it is also stopped when the interpreter exits)."""
+        with self._lock:
+            if self._session is not None:
+                self._run(self._session.aclose())
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._session = self._loop = self._kaleido = None
+
+
+# One session per process, shared by the dashboard and report.py
+renderer = ChartRenderer()
+
+
+def report_images(report):
+    """Render the charts of the PDF report with the shared renderer, in one batch.
+    Args:
+        report (dict): As returned by clear_stats.stats().
+    Returns:
+        dict: image name (see pdf_create.IMAGES) -> PNG bytes."""
+    figures = report_figures(report)
+    return dict(zip(figures, renderer.render_bytes(figures.values())))
+
+
+class ChartExporter:
+    """PNG images of the dashboard charts, rendered once per distinct figure.
+
+    Images are content-addressed: a figure is rendered only if its hash is
+    neither in memory (the last MAX_IMAGES images) nor in
+    `cache_dir/<figure hash>.png` (the last MAX_CACHED_IMAGES images). Rendering (Kaleido) happens in a
+    background thread, so a page view only pays for the interactive figures;
+    the figures waiting when the thread is free are rendered together in one
+    batch. Sessions asking for the same figure share its render, and the
+    images are handed over as bytes, so concurrent sessions never share a
+    file.
+    Args:
+        cache_dir (str | Path): Where the rendered images are kept by hash
+            (None keeps them in memory only).
+        renderer (ChartRenderer): The Kaleido session used for the batches."""
+
+    def __init__(self, cache_dir=CACHE_DIR, renderer=renderer):
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.renderer = renderer
+        self._lock = threading.Lock()
+        self._executor = None
+        # figure hash -> (figure, Future of the PNG bytes), queued or rendering
+        self._pending = {}
+        self._queue = []
+        # figure hash -> PNG bytes, least recently used first
+        self._images = OrderedDict()
+
+    def _remember(self, key, data):
+        with self._lock:
+            self._images[key] = data
+            self._images.move_to_end(key)
+            while len(self._images) > MAX_IMAGES:
+                self._images.popitem(last=False)
+
+    def _cached(self, key):
+        with self._lock:
+            if key in self._images:
+                self._images.move_to_end(key)
+                return self._images[key]
+        data = read_cached(self.cache_dir / f"{key}.png") if self.cache_dir is not None else None
+        if data is not None:
+            self._remember(key, data)
+        return data
+
+    def _render_batch(self):
+        with self._lock:
+            batch = [(key, self._pending[key][0]) for key in self._queue]
+            self._queue = []
+        if not batch:
+            return
+        try:
+            images = self.renderer.render_bytes([fig for _, fig in batch])
+        except Exception as error:
+            for key, _ in batch:
+                self._forget(key)[1].set_exception(error)
+            return
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        for (key, _), data in zip(batch, images):
+            self._remember(key, data)
+            if self.cache_dir is not None:
+                write_atomic(data, self.cache_dir / f"{key}.png")
+            self._forget(key)[1].set_result(data)
+        if self.cache_dir is not None:
+            prune_cache(self.cache_dir, "*.png", MAX_CACHED_IMAGES)
+
+    def image(self, fig):
+        """Render `fig` as PNG in memory, in the background if it is not cached yet.
+        Args:
+            fig (plotly.graph_objects.Figure): The figure.
+        Returns:
+            Future: Resolves to the PNG bytes (already resolved on a cache hit)."""
+        key = figure_key(fig)
+        data = self._cached(key)
+        if data is not None:
+            future = Future()
+            future.set_result(data)
+            return future
+        with self._lock:
+            if key in self._pending:
+                return self._pending[key][1]
+            render = Future()
+            self._pending[key] = (fig, render)
+            self._queue.append(key)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="charts")
+            # Renders everything queued by then, so most submissions find an empty queue
+            self._executor.submit(self._render_batch)
+        return render
+
+    def _forget(self, key):
+        with self._lock:
+            return self._pending.pop(key)
+
+
+# Shared by every session of the dashboard (modules outlive Streamlit reruns)
+exporter = ChartExporter(cache_dir=None if IN_MEMORY else CACHE_DIR)
+
+
+def image(fig):
+    """Render `fig` as PNG bytes with the shared exporter (see `ChartExporter.image`)."""
+    return exporter.image(fig)
@@ -1,4 +1,10 @@
-import sqlite3
+import hashlib
+import json
+import aggregates
+import db
+import stats_pandas
+from matcher import KeywordMatcher
+from normalize import fold_title
 
 # Define los grupos de palabras clave aquí
 keyword_groups = {
@@ -50,110 +56,196 @@ words_economy = [
     "desarrollo", "crecimiento", "PIB", "riesgo país", "suba"
 ]
 
-def clean_duplicate_titles():
-    # Connect to the database
-    conn = sqlite3.connect("noticias.db")
-    cursor = conn.cursor()
+# Categories a title is classified into (a title can belong to several)
+categories = {
+    "politics": words_politics,
+    "tragedy": words_tragedy,
+    "economy": words_economy,
+}
 
-    # Delete duplicates, keeping the first occurrence
-    cursor.execute("""
-        DELETE FROM titles
-        WHERE rowid NOT IN (
-            SELECT MIN(rowid)
-            FROM titles
-            GROUP BY title
-        )
-    """)
 
-    conn.commit()
-    conn.close()
-    print("✅ Clear Data Base: Duplicates removed.")
+# Ways stats() can classify the titles
+BACKENDS = ("python", "pandas")
 
 
-def get_date_range():
-    """Return the oldest and newest dates in the database formatted as day/month/year."""
-    with sqlite3.connect("noticias.db") as conn:
-        cursor = conn.cursor()
-        # Use STRFTIME to format the dates directly in the SQL query
-        cursor.execute("SELECT STRFTIME('%d/%m/%Y', MIN(date)), STRFTIME('%d/%m/%Y', MAX(date)) FROM titles")
-        result = cursor.fetchone()
-    return result
+def keyword_lists():
+    """Return the category word lists and the keyword groups as one label -> keywords dict.
+    Labels are "category:<name>" and "group:<name>", the metric names of the aggregates."""
+    keywords = {f"category:{name}": words for name, words in categories.items()}
+    keywords.update({f"group:{group}": variants for group, variants in keyword_groups.items()})
+    return keywords
 
-def stats():
-    """Generate a report with various statistics from the database."""
-    # 1. Clean duplicates
-    clean_duplicate_titles()
 
-    # 2. Database connection
-    conn = sqlite3.connect("noticias.db")
-    cursor = conn.cursor()
+def build_matcher():
+    """Compile the category word lists and the keyword groups into one matcher.
+    The keywords are folded like title_norm, which the matcher reads as is:
+    titles are normalized once, when they are saved (see `normalize.fold_title`)."""
+    keywords = {label: [fold_title(word) for word in words] for label, words in keyword_lists().items()}
+    return KeywordMatcher(keywords, fold=None)
+
+
+def matcher_fingerprint():
+    """Hash of the keyword lists: stored aggregates are rebuilt when it changes."""
+    data = json.dumps({"categories": categories, "groups": keyword_groups, "fold": "nfkd-casefold"}, sort_keys=True)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
 
-    # 3. Fetch all titles and media at once
-    cursor.execute("SELECT news_media, title FROM titles")
-    rows = cursor.fetchall()
-    conn.close()
-
-    # 4. Initialize data structures
-    category_counts = {}
-    
-    # Initialize keyword_counts usando los grupos
-    keyword_counts = {group: {} for group in keyword_groups}
-    total_titles_per_media = {}
-    
-    total_politics, total_tragedy, total_economy = 0, 0, 0
-    
-    # Process data in a single loop
-    for media, title in rows:
-        title_upper = title.upper() # Standardize for comparison
-
-        # Initialize dictionaries for the media if they don't exist
-        if media not in category_counts:
-            category_counts[media] = {"politics": 0, "tragedy": 0, "economy": 0}
-            total_titles_per_media[media] = 0
-
-        total_titles_per_media[media] += 1
-
-        # Count by category (a title can belong to multiple categories)
-        is_politics = any(word.upper() in title_upper for word in words_politics)
-        is_tragedy = any(word.upper() in title_upper for word in words_tragedy)
-        is_economy = any(word.upper() in title_upper for word in words_economy)
-
-        if is_politics:
-            category_counts[media]["politics"] += 1
-            total_politics += 1
-        if is_tragedy:
-            category_counts[media]["tragedy"] += 1
-            total_tragedy += 1
-        if is_economy:
-            category_counts[media]["economy"] += 1
-            total_economy += 1
-
-        # Count specific keywords using the groups
-        for group, variants in keyword_groups.items():
-            if media not in keyword_counts[group]:
-                keyword_counts[group][media] = 0
-            if any(variant in title_upper for variant in variants):
-                keyword_counts[group][media] += 1
-
-    # 5. Get other data
-    date_range = get_date_range()
-    
-    conn = sqlite3.connect("noticias.db")
+# Built once at import, then every title is classified in a single pass
+matcher = build_matcher()
+fingerprint = matcher_fingerprint()
+
+
+def clean_duplicate_titles(database=None):
+    """Collapse duplicate titles and turn on insert-time deduplication.
+    This runs the pending schema migrations (once per process): after them,
+    duplicates are rejected when they are inserted and nothing is deleted here."""
+    (database or db.get_database()).ensure_schema()
+
+
+def get_date_range(conn=None):
+    """Return the oldest and newest dates in the database formatted as day/month/year.
+    Args:
+        conn (sqlite3.Connection): A connection to reuse. If None, one is borrowed from the pool."""
+    if conn is None:
+        with db.get_database().read() as conn:
+            return get_date_range(conn)
     cursor = conn.cursor()
-    cursor.execute("SELECT COUNT(*) FROM titles")
-    total_titles = cursor.fetchone()[0]
-    conn.close()
+    # scraped_at is indexed: each subquery is a single index lookup instead of a full scan
+    cursor.execute("""
+        SELECT STRFTIME('%d/%m/%Y', (SELECT MIN(scraped_at) FROM titles), 'unixepoch', 'localtime'),
+               STRFTIME('%d/%m/%Y', (SELECT MAX(scraped_at) FROM titles), 'unixepoch', 'localtime')
+    """)
+    return cursor.fetchone()
+
+
+def stats(db_path=None, incremental=True, chunk_size=aggregates.CHUNK_SIZE, workers=1, backend="python",
+          start=None, end=None, granularity=None, unique_stories=False):
+    """Generate a report with various statistics from the database.
+    Args:
+        db_path (str | Path): The database file (see `db.resolve_db_path`).
+        incremental (bool): Classify only the titles added since the last call
+            and read the counts from the stored aggregates. If False, every
+            title is classified again.
+        chunk_size (int): Rows read from the database at a time while
+            classifying, which bounds the memory used.
+        workers (int): Number of processes classifying the titles. Worth it
+            for large archives (or the first report after the keyword lists
+            change); the report is the same whatever the number.
+        backend (str): "python" classifies with the keyword matcher, "pandas"
+            loads the titles into a DataFrame and classifies them with one
+            regex pass per category (always a full scan; needs pandas).
+        start (str | date): Only count the titles from this day on ("YYYY-MM-DD").
+        end (str | date): Only count the titles up to this day, included.
+        granularity (str): Add a "series" entry with the counts of every
+            "day", "week" or "month" of the window (see `_build_series`).
+            Windows and series are read from the daily aggregates, so they
+            need the incremental python backend.
+        unique_stories (bool): Count stories instead of headlines: near
+            duplicates of a title (see minhash.py) count once per outlet.
+    Returns:
+        dict: The report."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown stats backend {backend!r}, choose one of: {', '.join(BACKENDS)}")
+    windowed = start is not None or end is not None or granularity is not None
+    if windowed and (backend != "python" or not incremental):
+        raise ValueError("Time windows are read from the daily aggregates: use incremental=True and the python backend")
+    incremental = incremental and backend == "python"
+    database = db.get_database(db_path)
+    # 1. Make sure duplicates are collapsed (only migrates the first time, then read-only)
+    clean_duplicate_titles(database)
+
+    if incremental:
+        # 2. Bring the aggregates up to date with the new titles only
+        aggregates.refresh(database, matcher.match, fingerprint, chunk_size, workers)
+
+    # 3. Borrow one read connection for every query of the report
+    with database.read() as conn:
+        if backend == "pandas":
+            counts = stats_pandas.counts(conn, keyword_lists(), unique_stories)
+        elif incremental:
+            counts = aggregates.totals(conn, start, end, unique_stories)
+        else:
+            counts = _scan_counts(database, conn, chunk_size, workers, unique_stories)
+
+        if not windowed:
+            return _build_report(conn, counts)
+        first, last = aggregates.day_range(conn, start, end)
+        report = _build_report(conn, counts, (_format_day(first), _format_day(last)))
+        if granularity is not None:
+            medias = [media for media, _ in report["titles_per_media"]]
+            report["series"] = _build_series(conn, granularity, start, end, medias, unique_stories)
+        return report
+
+
+SCAN_QUERY = """
+    SELECT m.name, t.title_norm
+    FROM titles t JOIN media m ON m.id = t.media_id
+    WHERE t.id > ? AND t.id <= ?
+    ORDER BY t.id
+"""
+UNIQUE_SCAN_QUERY = SCAN_QUERY.replace("ORDER BY", f"AND {aggregates.FIRST_OF_STORY}\n    ORDER BY")
+
+
+def _scan_counts(database, conn, chunk_size, workers, unique_stories=False):
+    """Classify every title in the database, streaming the rows in chunks.
+    Returns:
+        dict: (media name, metric) -> count, media in order of first appearance."""
+    query = UNIQUE_SCAN_QUERY if unique_stories else SCAN_QUERY
+    last = conn.execute("SELECT COALESCE(MAX(id), 0) FROM titles").fetchone()[0]
+    if workers > 1:
+        return aggregates.count_parallel(database.path, query, 0, last, matcher.match, 1, chunk_size, workers)
+    return aggregates.count_range(conn, query, 0, last, matcher.match, 1, chunk_size)
+
+
+def _format_day(day):
+    """Format a "YYYY-MM-DD" day as day/month/year, like `get_date_range`."""
+    return "/".join(reversed(day.split("-"))) if day else None
+
+
+def _build_series(conn, granularity, start, end, medias, unique_stories=False):
+    """Return the time series of a window: one value per period for every media.
+    Returns:
+        dict: {"granularity", "periods": [first day of each period],
+            "titles": {media: [..]}, "categories": {name: {media: [..]}},
+            "keywords": {group: {media: [..]}}}. Periods without titles count 0."""
+    counts = aggregates.series(conn, granularity, start, end, unique_stories)
+    # Every period between the first and the last one with titles, so the gaps show as 0
+    found = sorted({period for period, _, _ in counts})
+    periods = aggregates.periods(found[0], found[-1], granularity) if found else []
+
+    def values(metric):
+        return {media: [counts.get((period, media, metric), 0) for period in periods] for media in medias}
 
-    # Return the report
     return {
-        "date_range": date_range,
-        "titles_per_media": list(total_titles_per_media.items()),
+        "granularity": granularity,
+        "periods": periods,
+        "titles": values("total"),
+        "categories": {name: values(f"category:{name}") for name in categories},
+        "keywords": {group: values(f"group:{group}") for group in keyword_groups},
+    }
+
+
+def _build_report(conn, counts, date_range=None):
+    """Assemble the report dict from (media name, metric) counts."""
+    medias = list(dict.fromkeys(media for media, _ in counts))
+    titles_per_media = [(media, counts.get((media, "total"), 0)) for media in medias]
+    category_counts = {
+        media: {name: counts.get((media, f"category:{name}"), 0) for name in categories}
+        for media in medias
+    }
+    keyword_counts = {
+        group: {media: counts.get((media, f"group:{group}"), 0) for media in medias}
+        for group in keyword_groups
+    }
+    return {
+        "date_range": date_range or get_date_range(conn),
+        "titles_per_media": titles_per_media,
         "category_counts_per_media": category_counts,
         "specific_keywords_counts": keyword_counts,
         "totals": {
-            "total_titles": total_titles,
-            "politics_titles": total_politics,
-            "tragedy_titles": total_tragedy,
-            "economy_titles": total_economy
+            "total_titles": sum(n for _, n in titles_per_media),
+            "politics_titles": sum(c["politics"] for c in category_counts.values()),
+            "tragedy_titles": sum(c["tragedy"] for c in category_counts.values()),
+            "economy_titles": sum(c["economy"] for c in category_counts.values())
         }
-    }
\ No newline at end of file
+    }
@@ -1,32 +1,107 @@
-import sqlite3
-from pathlib import Path
-from datetime import datetime
+import time
+import db
+import minhash
+from normalize import fold_title, normalize_title, title_hash  # noqa: F401 (re-exported)
 
-DB_PATH = Path(__file__).parent / "noticias.db"
+DB_PATH = db.DEFAULT_DB_PATH
+
+class TitleStore:
+    """Writes titles through the single writer connection of a database.
+
+    The writer runs in WAL mode, so the dashboard can keep reading while
+    titles are written, and every call to `save` is a single transaction.
+    Titles already in the database are skipped by the unique title_hash index,
+    the matching form of every title (title_norm) is computed once, here, and
+    new titles join the story of their near duplicates (see minhash.py).
+    Args:
+        db_path (str | Path): The database file (see `db.resolve_db_path`)."""
+
+    def __init__(self, db_path=None):
+        self.database = db.get_database(db_path)
+        self.db_path = self.database.path
+        with self.database.write_lock:
+            self._media_ids = dict(self.conn.execute("SELECT name, id FROM media"))
+
+    @property
+    def conn(self):
+        return self.database.writer()
+
+    def media_id(self, news_media):
+        """Return the id of `news_media` in the media table, adding it if needed."""
+        media_id = self._media_ids.get(news_media)
+        if media_id is None:
+            with self.database.write_lock, self.conn:
+                self.conn.execute("INSERT OR IGNORE INTO media (name) VALUES (?)", (news_media,))
+                media_id = self.conn.execute("SELECT id FROM media WHERE name = ?", (news_media,)).fetchone()[0]
+            self._media_ids[news_media] = media_id
+        return media_id
+
+    def save(self, news_media, titles):
+        """Save a batch of news titles in one transaction.
+        Args:
+            news_media (str): The news source.
+            titles (list): A list of news titles.
+        Returns:
+            int: The number of new titles inserted (duplicates are ignored)."""
+        
+        return self.save_many({news_media: titles})[news_media]
+
+    def save_many(self, titles_per_media):
+        """Save the titles of several outlets in one transaction.
+        Every commit rewrites the touched pages of the title_hash index, so
+        one commit per scraping run is much cheaper than one per outlet.
+        Args:
+            titles_per_media (dict): News source -> list of news titles.
+        Returns:
+            dict: News source -> number of new titles inserted."""
+        
+        media_ids = {media: self.media_id(media) for media in titles_per_media}
+        scraped_at = int(time.time())
+        saved = {}
+        with self.database.write_lock, self.conn:
+            # Ids only grow and the write lock is held: the new titles are the ones past this mark
+            last_id = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM titles").fetchone()[0]
+            for media, titles in titles_per_media.items():
+                cursor = self.conn.executemany(
+                    "INSERT OR IGNORE INTO titles (media_id, title, title_hash, title_norm, scraped_at) VALUES (?, ?, ?, ?, ?)",
+                    ((media_ids[media], t, title_hash(t), fold_title(t), scraped_at) for t in titles),
+                )
+                saved[media] = cursor.rowcount
+            # Stories are always built in id order: while older titles wait for
+            # the backfill, the new ones join the backlog instead
+            waiting = self.conn.execute(
+                "SELECT 1 FROM titles WHERE cluster_id IS NULL AND id <= ? LIMIT 1", (last_id,)
+            ).fetchone()
+            if not waiting:
+                new = self.conn.execute("SELECT id, title_norm FROM titles WHERE id > ? ORDER BY id", (last_id,)).fetchall()
+                minhash.assign_clusters(self.conn, new)
+        if waiting:
+            # Resumes a backfill that was interrupted (see db.Database.backfill)
+            self.database.backfill()
+        return saved
+
+    def close(self):
+        """Close the writer connection (it is reopened if the database is written again)."""
+        self.database.close_writer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_store = None
 
 def save_titles(news_media, titles):
     """Save news titles to the SQLite database.
     Args:
-        medio (str): The news source.
-        titles (list): A list of news titles."""
-    
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    cursor.execute("""
-    CREATE TABLE IF NOT EXISTS titles (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        news_media TEXT,
-        title TEXT,
-        date TEXT
-    )
-    """)
-    
-    date = datetime.now().strftime("%Y-%m-%d")
-    for t in titles:
-        cursor.execute(
-            "INSERT INTO titles (news_media, title, date) VALUES (?, ?, ?)", (news_media, t, date)
-        )
+        news_media (str): The news source.
+        titles (list): A list of news titles.
+    Returns:
+        int: The number of new titles inserted (duplicates are ignored)."""
     
-    conn.commit()
-    conn.close()
+    global _store
+    if _store is None:
+        _store = TitleStore()
+    return _store.save(news_media, titles)
@@ -0,0 +1,153 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from migrations import backfill_clusters, first_unclustered, migrate, schema_version
+
+# The database every entry point uses, unless NOTICIAS_DB or --db says otherwise
+DEFAULT_DB_PATH = Path(__file__).parent / "noticias.db"
+DB_ENV = "NOTICIAS_DB"
+
+
+def resolve_db_path(path=None):
+    """Return the absolute database path: `path`, else $NOTICIAS_DB, else src/noticias.db.
+    Relative paths are resolved against the working directory once, here."""
+    return Path(path or os.environ.get(DB_ENV) or DEFAULT_DB_PATH).expanduser().resolve()
+
+
+def add_db_argument(parser):
+    """Add the --db option to an argparse parser."""
+    parser.add_argument("--db", default=None, help=f"database file (default: ${DB_ENV} or {DEFAULT_DB_PATH.name})")
+
+
+class Database:
+    """Connections to one SQLite database file.
+
+    There is a single writer connection (WAL mode, guarded by `write_lock`)
+    and a pool of read-only connections that any thread can borrow, which is
+    what the Streamlit dashboard needs. The schema is migrated the first time
+    the database is used; the titles still without a story are then clustered
+    in batches by a background thread (see `backfill`), so no caller waits
+    for a whole archive.
+    Args:
+        path (Path): The database file.
+        pool_size (int): Maximum number of idle read connections kept open.
+        cache_size (int): SQLite page cache size (negative values are KiB)."""
+
+    def __init__(self, path, pool_size=4, cache_size=-16000):
+        self.path = Path(path)
+        self.cache_size = int(cache_size)
+        self.write_lock = threading.RLock()
+        self._writer = None
+        self._readers = queue.LifoQueue(maxsize=pool_size)
+        self._backfill_lock = threading.Lock()
+        self._backfill_thread = None
+        self._backfill_requested = False
+
+    def writer(self):
+        """Return the writer connection, opening it (and migrating the schema) on first use."""
+        with self.write_lock:
+            if self._writer is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(self.path, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                # NORMAL is durable in WAL mode except for the last commits on power loss
+                conn.execute("PRAGMA synchronous=NORMAL")
+                conn.execute(f"PRAGMA cache_size={self.cache_size}")
+                migrate(conn)
+                self._writer = conn
+                if schema_version(conn) >= 7 and first_unclustered(conn) is not None:
+                    self.backfill()
+            return self._writer
+
+    def backfill(self):
+        """Cluster the titles still without a story in a background thread.
+        Resumes an interrupted backfill (see `migrations.backfill_clusters`).
+        Calling it while the thread runs makes it look again once done, so
+        titles saved meanwhile are never left behind. The thread is not a
+        daemon: a process finishes the batch in progress before exiting."""
+        with self._backfill_lock:
+            self._backfill_requested = True
+            if self._backfill_thread is None:
+                self._backfill_thread = threading.Thread(target=self._backfill, name="backfill")
+                self._backfill_thread.start()
+
+    def _backfill(self):
+        while True:
+            with self._backfill_lock:
+                if not self._backfill_requested:
+                    self._backfill_thread = None
+                    return
+                self._backfill_requested = False
+            try:
+                backfill_clusters(self.writer(), self.write_lock)
+            except sqlite3.Error as e:
+                # The titles stay waiting: the next save or stats refresh asks again
+                print(f"An error occurred while grouping the titles into stories: {e}")
+
+    def wait_backfill(self):
+        """Wait until the background backfill, if any, is done."""
+        thread = self._backfill_thread
+        if thread is not None:
+            thread.join()
+
+    def ensure_schema(self):
+        """Make sure the database exists and its schema is up to date."""
+        self.writer()
+
+    def _open_reader(self):
+        self.ensure_schema()
+        conn = sqlite3.connect(f"{self.path.as_uri()}?mode=ro", uri=True, check_same_thread=False)
+        conn.execute(f"PRAGMA cache_size={self.cache_size}")
+        return conn
+
+    @contextmanager
+    def read(self):
+        """Borrow a read-only connection from the pool for the duration of a `with` block."""
+        try:
+            conn = self._readers.get_nowait()
+        except queue.Empty:
+            conn = self._open_reader()
+        try:
+            yield conn
+        finally:
+            # Never hand a connection back in the middle of a transaction
+            if conn.in_transaction:
+                conn.rollback()
+            try:
+                self._readers.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def close_writer(self):
+        """Close the writer connection, once the backfill is done with it."""
+        self.wait_backfill()
+        with self.write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+    def close(self):
+        """Close the writer and every idle read connection."""
+        self.close_writer()
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_databases = {}
+_databases_lock = threading.Lock()
+
+
+def get_database(path=None):
+    """Return the shared `Database` of `path` (see `resolve_db_path`), one per file and process."""
+    path = resolve_db_path(path)
+    with _databases_lock:
+        database = _databases.get(path)
+        if database is None:
+            database = _databases[path] = Database(path)
+        return database
@@ -0,0 +1,152 @@
+from html.parser import HTMLParser
+from profiles import get_profile
+
+# Tags whose text is never part of a headline
+SKIP_TEXT_TAGS = {"script", "style", "template", "noscript"}
+
+
+def extract_bs4(html, outlet=None):
+    """Original extractor: full BeautifulSoup tree walked twice.
+    Args:
+        html (str): The HTML content of the page.
+        outlet (str): Unused, the same heuristic is applied to every outlet.
+    Returns:
+        list: A list of news titles."""
+
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, 'html.parser')
+    titles = []
+
+    # Assuming news titles are within <h2> tags with a specific class
+    for title in soup.find_all(['h1','h2','h3']):
+       if title.text.strip() and len(title.text.strip()) > 15:
+           titles.append(title.text.strip())
+
+    for element in soup.select('card_headline'):
+        if element.text.strip() and element.text.strip() not in titles:
+            titles.append(element.text.strip())
+
+    return titles
+
+
+class HeadlineParser(HTMLParser):
+    """Streaming parser that only keeps the text of headline tags.
+
+    No tree is built: the page is read once and only the open headline nodes
+    collect text. Which nodes are headlines, which subtrees are skipped and
+    which texts are kept comes from an extraction profile (see profiles.py).
+    Titles come out in document order without duplicates.
+    Args:
+        profile (CompiledProfile): The rules to apply. Defaults to h1-h3
+            headlines longer than 15 characters."""
+
+    def __init__(self, profile=None):
+        self.profile = profile or get_profile(None)
+        super().__init__(convert_charrefs=True)
+
+    def reset(self):
+        super().reset()
+        # One [tag, text parts] entry per headline, in start-tag order
+        self._nodes = []
+        self._open = []
+        self._skip = 0
+        # [tag, depth] of the excluded or ignored element we are inside of
+        self._excluded = None
+        self._ignored = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SKIP_TEXT_TAGS:
+            self._skip += 1
+            return
+        if self._excluded:
+            if tag == self._excluded[0]:
+                self._excluded[1] += 1
+            return
+        if self._ignored and tag == self._ignored[0]:
+            self._ignored[1] += 1
+        profile = self.profile
+        classes = _classes(attrs) if attrs else frozenset()
+        if profile.exclude and profile.is_excluded(tag, classes):
+            self._excluded = [tag, 1]
+            return
+        if self._open and not self._ignored and profile.ignore and profile.is_ignored(tag, classes):
+            self._ignored = [tag, 1]
+        if (tag in profile.headline_tags or None in profile.headline_tags) and profile.is_headline(tag, classes):
+            node = [tag, []]
+            self._nodes.append(node)
+            self._open.append(node)
+
+    def handle_endtag(self, tag):
+        if tag in SKIP_TEXT_TAGS:
+            self._skip = max(self._skip - 1, 0)
+            return
+        if self._excluded:
+            if tag == self._excluded[0]:
+                self._excluded[1] -= 1
+                if not self._excluded[1]:
+                    self._excluded = None
+            return
+        if self._ignored and tag == self._ignored[0]:
+            self._ignored[1] -= 1
+            if not self._ignored[1]:
+                self._ignored = None
+        # Close the innermost open node of this tag, like a tree builder would
+        for i in range(len(self._open) - 1, -1, -1):
+            if self._open[i][0] == tag:
+                del self._open[i:]
+                break
+
+    def handle_data(self, data):
+        if self._open and not (self._skip or self._excluded or self._ignored):
+            # Nested headlines contribute their text to every open ancestor
+            for node in self._open:
+                node[1].append(data)
+
+    def titles(self):
+        """Return the titles found so far, in order and without duplicates."""
+        titles = {}
+        accepts = self.profile.accepts
+        for _, parts in self._nodes:
+            text = "".join(parts).strip()
+            if accepts(text):
+                titles[text] = None
+        return list(titles)
+
+    def extract(self, html):
+        """Parse a whole page and return its titles.
+        Args:
+            html (str): The HTML content of the page.
+        Returns:
+            list: A list of news titles."""
+        self.reset()
+        self.feed(html)
+        self.close()
+        return self.titles()
+
+
+def _classes(attrs):
+    for name, value in attrs:
+        if name == "class" and value:
+            return frozenset(value.split())
+    return frozenset()
+
+
+def extract_fast(html, outlet=None):
+    """Single-pass extractor built on `HeadlineParser`, using the outlet's profile."""
+    return HeadlineParser(get_profile(outlet)).extract(html)
+
+
+# Available extractor backends, selectable by name
+EXTRACTORS = {
+    "fast": extract_fast,
+    "bs4": extract_bs4,
+}
+
+
+def get_extractor(name="fast"):
+    """Return the extractor function registered as `name`."""
+    try:
+        return EXTRACTORS[name]
+    except KeyError:
+        raise ValueError(f"Unknown extractor {name!r}, choose one of {sorted(EXTRACTORS)}") from None
@@ -0,0 +1,142 @@
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+# requests and asyncio are imported on the first fetch: the scraper's options
+# and the modules that only need NOT_MODIFIED start without them.
+
+# User-Agent header to mimic a browser request
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'
+}
+
+# Returned instead of the HTML when a cached page has not changed
+NOT_MODIFIED = object()
+# A page downloaded with a cache: its HTML and the cache entry (validators and
+# body hash) to commit once the page has been processed (see HttpCache.commit)
+Page = namedtuple("Page", ["text", "entry"])
+
+
+class FetchEngine:
+    """Fetch many pages concurrently while reusing connections.
+
+    Every host gets its own keep-alive session (a pool of at most `per_host`
+    connections). The asyncio side only schedules the work: it caps the number
+    of requests in flight globally and per host, and gives every request a
+    deadline. The blocking `requests` calls run in a thread pool.
+    Args:
+        max_concurrency (int): Maximum number of requests in flight.
+        per_host (int): Maximum number of requests in flight per host.
+        timeout (float): Socket timeout in seconds (connect and read).
+        deadline (float): Total time budget for a single request, slow
+            trickling responses included. Defaults to twice `timeout`.
+        headers (dict): Headers sent with every request."""
+
+    def __init__(self, max_concurrency=8, per_host=2, timeout=10, deadline=None, headers=None):
+        self.max_concurrency = max_concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.deadline = deadline or timeout * 2
+        self.headers = dict(headers or HEADERS)
+        self._sessions = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="fetch")
+
+    def _session(self, url):
+        """Return the keep-alive session for the host of `url`, creating it once."""
+        host = urlsplit(url).netloc
+        session = self._sessions.get(host)
+        if session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            session.headers.update(self.headers)
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.per_host, pool_block=True)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._sessions[host] = session
+        return session
+
+    def get(self, url, cache=None):
+        """Fetch a single page synchronously.
+        Args:
+            url (str): The URL to fetch.
+            cache (HttpCache): If given, send a conditional request with its
+                validators. The cache is only read: the caller commits the
+                entry of the Page once it has processed it.
+        Returns:
+            str: The HTML content of the page (a Page with a cache),
+            NOT_MODIFIED if the server answered 304, or None if the request fails."""
+        import requests
+
+        try:
+            headers = cache.conditional_headers(url) if cache else None
+            response = self._session(url).get(url, headers=headers, timeout=self.timeout)
+
+            if cache and response.status_code == 304:
+                return NOT_MODIFIED
+            # Verify if the request was successful
+            if response.status_code == 200:
+                if cache:
+                    return Page(response.text, cache.entry(response.headers, response.content))
+                return response.text
+            print(f"Failed to retrieve the page {url}: Status code {response.status_code}")
+            return None
+        except requests.RequestException as e:
+            print(f"An error occurred while fetching the page {url}: {e}")
+            return None
+
+    async def fetch_many(self, urls, cache=None):
+        """Fetch all `urls` concurrently.
+        Args:
+            urls (iterable): The URLs to fetch.
+            cache (HttpCache): Optional validator cache, see `get`.
+        Returns:
+            dict: URL -> HTML content (a Page with a cache), NOT_MODIFIED, or
+            None for the pages that failed. A request past its deadline counts
+            as failed: its thread cannot be stopped, but what it returns later
+            is dropped, and it never touches the cache."""
+        import asyncio
+
+        urls = list(dict.fromkeys(urls))
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(self.max_concurrency)
+        host_slots = {}
+
+        async def fetch_one(url):
+            host = urlsplit(url).netloc
+            if host not in host_slots:
+                host_slots[host] = asyncio.Semaphore(self.per_host)
+            # Create the session on the loop thread so workers never race on it
+            self._session(url)
+            async with slots, host_slots[host]:
+                try:
+                    return await asyncio.wait_for(
+                        loop.run_in_executor(self._executor, self.get, url, cache), self.deadline
+                    )
+                except asyncio.TimeoutError:
+                    print(f"An error occurred while fetching the page {url}: deadline of {self.deadline}s exceeded")
+                    return None
+
+        pages = await asyncio.gather(*(fetch_one(url) for url in urls))
+        return dict(zip(urls, pages))
+
+    def fetch_all(self, urls, cache=None):
+        """Synchronous facade over `fetch_many` for callers without an event loop."""
+        import asyncio
+
+        return asyncio.run(self.fetch_many(urls, cache))
+
+    def close(self):
+        """Close every pooled connection and stop the worker threads."""
+        for session in self._sessions.values():
+            session.close()
+        self._sessions.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
@@ -0,0 +1,103 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent
+CACHE_PATH = project_root / "resource" / "cache" / "http_cache.json"
+
+
+class HttpCache:
+    """Small on-disk cache of validators for the outlet homepages.
+
+    For every URL it remembers the ETag, the Last-Modified date and a hash of
+    the last body downloaded. It is used to send conditional requests and to
+    tell when a page has not changed since the previous run.
+    Args:
+        path (str | Path): The JSON file the cache is stored in."""
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._entries = {}
+        if self.path.exists():
+            try:
+                self._entries = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable cache {self.path}: {e}")
+        self.reset_counters()
+
+    def reset_counters(self):
+        """Start counting hits and misses from zero (called at the start of each run)."""
+        self.not_modified = 0
+        self.same_content = 0
+        self.misses = 0
+
+    def conditional_headers(self, url):
+        """Return the If-None-Match/If-Modified-Since headers for `url`."""
+        entry = self._entries.get(url, {})
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def record_not_modified(self, url):
+        """Count a 304 answer for `url`."""
+        with self._lock:
+            self.not_modified += 1
+
+    @staticmethod
+    def entry(headers, body):
+        """Return the cache entry of a 200 answer: its validators and the hash of its body.
+        Args:
+            headers (Mapping): The response headers.
+            body (bytes): The response body.
+        Returns:
+            dict: etag, last_modified and hash."""
+        return {
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+            "hash": hashlib.sha256(body).hexdigest(),
+        }
+
+    def check(self, url, entry):
+        """Count the answer of `url` as a hit or a miss, without storing it.
+        Args:
+            url (str): The URL that was fetched.
+            entry (dict): As returned by `entry`.
+        Returns:
+            bool: True if the body is new, False if it is identical to the cached one."""
+        with self._lock:
+            if self._entries.get(url, {}).get("hash") == entry["hash"]:
+                self.same_content += 1
+                return False
+            self.misses += 1
+            return True
+
+    def commit(self, url, entry):
+        """Store the entry of `url`, once its page has been processed.
+        Until then the page keeps being downloaded and parsed: an entry stored
+        before its titles are saved would hide them if the save failed."""
+        with self._lock:
+            self._entries[url] = entry
+
+    def counters(self):
+        """Return the hit/miss counters of the current run."""
+        hits = self.not_modified + self.same_content
+        return {
+            "hits": hits,
+            "not_modified": self.not_modified,
+            "same_content": self.same_content,
+            "misses": self.misses,
+        }
+
+    def save(self):
+        """Write the cache to disk atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with self._lock:
+            tmp.write_text(json.dumps(self._entries, indent=2), encoding="utf-8")
+        os.replace(tmp, self.path)
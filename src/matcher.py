@@ -0,0 +1,80 @@
+from collections import deque
+
+
+class KeywordMatcher:
+    """Find every labelled keyword contained in a text in one pass (Aho–Corasick).
+
+    The automaton is compiled once from the keyword lists. `match` then walks
+    the text a single time, whatever the number of keywords, and returns the
+    labels with at least one keyword inside the text. The result is the same
+    as `any(fold(word) in fold(text) for word in words)` for every label.
+    Args:
+        keywords (dict): Label -> list of keywords.
+        fold (callable): Applied to the text and to every keyword before
+            matching (str.upper by default, like the original comparison).
+            None when both are already folded, e.g. precomputed at insert time."""
+
+    def __init__(self, keywords, fold=str.upper):
+        # Kept as given (None included), so the matcher stays picklable for worker processes
+        self.fold = fold
+        self.labels = list(keywords)
+        goto = [{}]
+        output = [0]
+        for bit, label in enumerate(self.labels):
+            for word in keywords[label]:
+                if fold is not None:
+                    word = fold(word)
+                if not word:
+                    continue
+                state = 0
+                for ch in word:
+                    nxt = goto[state].get(ch)
+                    if nxt is None:
+                        nxt = len(goto)
+                        goto[state][ch] = nxt
+                        goto.append({})
+                        output.append(0)
+                    state = nxt
+                output[state] |= 1 << bit
+
+        # Breadth-first pass: failure links, merged outputs and a complete
+        # transition table, so matching never has to follow a failure link
+        fail = [0] * len(goto)
+        delta = [dict(goto[0])]
+        delta.extend({} for _ in range(len(goto) - 1))
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            output[state] |= output[fail[state]]
+            row = dict(delta[fail[state]])
+            for ch, nxt in goto[state].items():
+                fail[nxt] = delta[fail[state]].get(ch, 0)
+                row[ch] = nxt
+                queue.append(nxt)
+            delta[state] = row
+        self._delta = delta
+        self._output = output
+        self._label_sets = {}
+
+    def match_mask(self, text):
+        """Return the bit mask of the labels found in `text` (bit i is `labels[i]`)."""
+        delta = self._delta
+        output = self._output
+        state = 0
+        mask = 0
+        if self.fold is not None:
+            text = self.fold(text)
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            mask |= output[state]
+        return mask
+
+    def match(self, text):
+        """Return the tuple of labels with at least one keyword in `text`."""
+        mask = self.match_mask(text)
+        labels = self._label_sets.get(mask)
+        if labels is None:
+            labels = self._label_sets[mask] = tuple(
+                label for bit, label in enumerate(self.labels) if mask >> bit & 1
+            )
+        return labels
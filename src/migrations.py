@@ -0,0 +1,251 @@
+import time
+from minhash import assign_clusters
+from normalize import fold_title, title_hash
+
+# Versioned schema migrations. The version of a database is kept in
+# PRAGMA user_version; every migration runs once, in its own transaction.
+# Migrations only change the schema: long backfills run afterwards, in
+# batches (see `backfill_clusters`), so they never hold the write lock for long.
+
+# Titles clustered per transaction by `backfill_clusters`, and the pause
+# between two transactions that lets the other processes take the write lock
+BACKFILL_BATCH = 500
+BACKFILL_PAUSE = 0.05
+
+
+def create_titles(conn):
+    """Version 1: the original titles table."""
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS titles (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        news_media TEXT,
+        title TEXT,
+        date TEXT
+    )
+    """)
+
+
+def add_title_hash(conn):
+    """Version 2: title_hash column with a unique index, existing duplicates collapsed."""
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(titles)")}
+    if "title_hash" not in columns:
+        conn.execute("ALTER TABLE titles ADD COLUMN title_hash INTEGER")
+    conn.execute("UPDATE titles SET title_hash = title_hash(title) WHERE title_hash IS NULL")
+    # Keep the first occurrence of every title
+    removed = conn.execute("""
+        DELETE FROM titles
+        WHERE id NOT IN (
+            SELECT MIN(id)
+            FROM titles
+            GROUP BY title_hash
+        )
+    """).rowcount
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_titles_title_hash ON titles(title_hash)")
+    if removed:
+        print(f"✅ Clear Data Base: {removed} duplicates removed.")
+
+
+def normalize_media_and_dates(conn):
+    """Version 3: media lookup table, epoch scraped_at column and indexes.
+
+    The outlet name moves to the media table (in order of first appearance)
+    and the day-only date becomes local midnight as seconds since the epoch."""
+    conn.execute("""
+    CREATE TABLE media (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE
+    )
+    """)
+    conn.execute("""
+        INSERT INTO media (name)
+        SELECT news_media FROM titles
+        WHERE news_media IS NOT NULL
+        GROUP BY news_media
+        ORDER BY MIN(id)
+    """)
+    conn.execute("""
+    CREATE TABLE titles_new (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        media_id INTEGER NOT NULL REFERENCES media(id),
+        title TEXT NOT NULL,
+        title_hash INTEGER NOT NULL,
+        scraped_at INTEGER NOT NULL
+    )
+    """)
+    conn.execute("""
+        INSERT INTO titles_new (id, media_id, title, title_hash, scraped_at)
+        SELECT t.id, m.id, t.title, t.title_hash,
+               CAST(STRFTIME('%s', t.date, 'utc') AS INTEGER)
+        FROM titles t JOIN media m ON m.name = t.news_media
+        WHERE t.title IS NOT NULL
+        ORDER BY t.id
+    """)
+    conn.execute("DROP TABLE titles")
+    conn.execute("ALTER TABLE titles_new RENAME TO titles")
+    conn.execute("CREATE UNIQUE INDEX idx_titles_title_hash ON titles(title_hash)")
+    conn.execute("CREATE INDEX idx_titles_media_scraped ON titles(media_id, scraped_at)")
+    # MIN/MAX over all outlets can't use the (media_id, scraped_at) index
+    conn.execute("CREATE INDEX idx_titles_scraped ON titles(scraped_at)")
+
+
+def add_stats_aggregates(conn):
+    """Version 4: per-day aggregates of clear_stats and their high-water mark."""
+    # One row per (day, outlet, metric); metric is "total", "category:<name>" or "group:<name>"
+    conn.execute("""
+    CREATE TABLE stats_daily (
+        day TEXT NOT NULL,
+        media_id INTEGER NOT NULL REFERENCES media(id),
+        metric TEXT NOT NULL,
+        n INTEGER NOT NULL,
+        PRIMARY KEY (day, media_id, metric)
+    ) WITHOUT ROWID
+    """)
+    # Last titles.id already counted, and the keyword lists it was counted with
+    conn.execute("""
+    CREATE TABLE stats_state (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        last_rowid INTEGER NOT NULL,
+        fingerprint TEXT NOT NULL
+    )
+    """)
+
+
+def add_title_search(conn):
+    """Version 5: FTS5 full-text index of the titles, kept in sync by triggers."""
+    # External content: the index stores only the tokens, the text stays in titles.
+    # remove_diacritics folds accents, so "inflacion" finds "inflación"
+    conn.execute("""
+    CREATE VIRTUAL TABLE titles_fts USING fts5(
+        title,
+        content = 'titles',
+        content_rowid = 'id',
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """)
+    conn.execute("""
+    CREATE TRIGGER titles_fts_insert AFTER INSERT ON titles BEGIN
+        INSERT INTO titles_fts (rowid, title) VALUES (new.id, new.title);
+    END
+    """)
+    conn.execute("""
+    CREATE TRIGGER titles_fts_delete AFTER DELETE ON titles BEGIN
+        INSERT INTO titles_fts (titles_fts, rowid, title) VALUES ('delete', old.id, old.title);
+    END
+    """)
+    conn.execute("""
+    CREATE TRIGGER titles_fts_update AFTER UPDATE OF title ON titles BEGIN
+        INSERT INTO titles_fts (titles_fts, rowid, title) VALUES ('delete', old.id, old.title);
+        INSERT INTO titles_fts (rowid, title) VALUES (new.id, new.title);
+    END
+    """)
+    conn.execute("INSERT INTO titles_fts (titles_fts) VALUES ('rebuild')")
+
+
+def add_title_norm(conn):
+    """Version 6: title_norm column, the accent and case folded title the keyword matchers read."""
+    conn.execute("ALTER TABLE titles ADD COLUMN title_norm TEXT")
+    conn.execute("UPDATE titles SET title_norm = fold_title(title)")
+
+
+def add_story_clusters(conn):
+    """Version 7: near-duplicate stories (MinHash signature, cluster_id, LSH index) and unique-story aggregates.
+    The existing titles are clustered afterwards by `backfill_clusters`."""
+    conn.execute("ALTER TABLE titles ADD COLUMN minhash BLOB")
+    conn.execute("ALTER TABLE titles ADD COLUMN cluster_id INTEGER")
+    # One row per band of every signature; titles sharing a bucket are candidates
+    conn.execute("""
+    CREATE TABLE title_lsh (
+        bucket INTEGER NOT NULL,
+        title_id INTEGER NOT NULL REFERENCES titles(id),
+        PRIMARY KEY (bucket, title_id)
+    ) WITHOUT ROWID
+    """)
+    # "Is this the first title of its story in this outlet" is an index lookup
+    conn.execute("CREATE INDEX idx_titles_cluster_media ON titles(cluster_id, media_id)")
+    conn.execute("ALTER TABLE stats_daily ADD COLUMN n_unique INTEGER NOT NULL DEFAULT 0")
+    # The aggregates are rebuilt, with the unique counts, on the next refresh
+    conn.execute("DELETE FROM stats_state")
+
+
+# (version, description, upgrade function), in order
+MIGRATIONS = [
+    (1, "titles table", create_titles),
+    (2, "insert-time deduplication", add_title_hash),
+    (3, "media table, scraped_at and indexes", normalize_media_and_dates),
+    (4, "stats aggregates", add_stats_aggregates),
+    (5, "full-text search", add_title_search),
+    (6, "normalized titles", add_title_norm),
+    (7, "story clusters", add_story_clusters),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def first_unclustered(conn):
+    """Return the id of the oldest title without a story yet, or None."""
+    return conn.execute("SELECT MIN(id) FROM titles WHERE cluster_id IS NULL").fetchone()[0]
+
+
+def backfill_clusters(conn, lock, batch_size=BACKFILL_BATCH, pause=BACKFILL_PAUSE):
+    """Cluster the titles left without a story by migration 7, oldest first.
+    Every batch is its own transaction, so the scraper can keep inserting in
+    between. Its titles wait for the backfill (see `data_base.TitleStore`),
+    which makes the result the same as clustering the whole history at once.
+    Runs in the background thread of `db.Database.backfill`, and picks up
+    where an interrupted run stopped.
+    Args:
+        conn (sqlite3.Connection): The writer connection.
+        lock (threading.RLock): The writer's lock, held for each batch.
+        batch_size (int): Titles clustered per transaction.
+        pause (float): Seconds slept between two transactions. Without it the
+            loop takes the lock back before a waiting writer retries.
+    Returns:
+        int: The number of titles clustered."""
+    first = first_unclustered(conn) if schema_version(conn) >= 7 else None
+    if first is None:
+        return 0
+    # Walk the rowids from the oldest title waiting: every title before the mark has a story.
+    # "+cluster_id" keeps SQLite on the rowid range instead of sorting every waiting title
+    mark, done = first - 1, 0
+    while True:
+        with lock:
+            conn.execute("BEGIN IMMEDIATE")
+            with conn:
+                rows = conn.execute(
+                    "SELECT id, title_norm FROM titles WHERE id > ? AND +cluster_id IS NULL ORDER BY id LIMIT ?",
+                    (mark, batch_size),
+                ).fetchall()
+                assign_clusters(conn, rows)
+        if not rows:
+            break
+        mark, done = rows[-1][0], done + len(rows)
+        time.sleep(pause)
+    print(f"✅ Data Base: {done} titles grouped into stories")
+    return done
+
+
+def migrate(conn):
+    """Bring the database up to the latest schema version, upgrading in place.
+    Args:
+        conn (sqlite3.Connection): An open connection to the database.
+    Returns:
+        int: The schema version the database had before migrating."""
+    conn.create_function("title_hash", 1, title_hash, deterministic=True)
+    conn.create_function("fold_title", 1, fold_title, deterministic=True)
+    initial = schema_version(conn)
+    for version, description, upgrade in MIGRATIONS:
+        if version <= initial:
+            continue
+        # Take the write lock first, another process may have migrated meanwhile
+        conn.execute("BEGIN IMMEDIATE")
+        with conn:
+            if schema_version(conn) >= version:
+                continue
+            upgrade(conn)
+            conn.execute(f"PRAGMA user_version = {version}")
+        print(f"✅ Data Base: migrated to version {version} ({description})")
+    return initial
@@ -0,0 +1,123 @@
+import hashlib
+import operator
+import struct
+from functools import lru_cache
+
+# Near-duplicate headlines: MinHash signatures with an LSH index.
+# Every title gets a signature of its character shingles, stored with the
+# title, and its bands are put in the title_lsh table. A new title is only
+# compared with the titles sharing a band, so clustering costs the same
+# whatever the size of the database. Near duplicates share a cluster_id,
+# the id of the first title of the story.
+
+SHINGLE_SIZE = 5
+NUM_PERM = 32
+BANDS = 8
+ROWS = NUM_PERM // BANDS
+# Estimated Jaccard similarity from which two titles are the same story.
+# With 8 bands of 4 rows, pairs at 0.8 share a band 98% of the time, at 0.6
+# two times out of three (1 - (1 - s^4)^8).
+SIMILARITY = 0.6
+# Candidates compared per title, most recent first (bounds popular buckets)
+MAX_CANDIDATES = 50
+
+_PACK = struct.Struct(f"<{NUM_PERM}I")
+
+
+def shingles(text):
+    """Return the character shingles of `text` (title_norm) as a set of bytes."""
+    data = (text or "").encode("utf-8")
+    if len(data) <= SHINGLE_SIZE:
+        return {data}
+    return {data[i:i + SHINGLE_SIZE] for i in range(len(data) - SHINGLE_SIZE + 1)}
+
+
+@lru_cache(maxsize=1 << 13)
+def _shingle_hashes(shingle):
+    # Every 32-bit slice of the SHAKE-128 digest is an independent hash function,
+    # so one digest gives all the permutations. Common shingles ("cion ") hit the cache
+    return _PACK.unpack(hashlib.shake_128(shingle).digest(_PACK.size))
+
+
+def signature(text):
+    """Return the MinHash signature of `text` as NUM_PERM 32-bit values."""
+    return tuple(map(min, zip(*map(_shingle_hashes, shingles(text)))))
+
+
+def pack(sig):
+    """Signature -> the BLOB stored in titles.minhash."""
+    return _PACK.pack(*sig)
+
+
+def unpack(blob):
+    return _PACK.unpack(blob)
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(map(operator.eq, a, b)) / NUM_PERM
+
+
+def buckets(sig):
+    """Return the LSH bucket of every band of a signature (signed 64-bit, band included)."""
+    keys = []
+    for band in range(BANDS):
+        data = struct.pack(f"<B{ROWS}I", band, *sig[band * ROWS:(band + 1) * ROWS])
+        keys.append(int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big", signed=True))
+    return keys
+
+
+def find_similar(conn, text, limit=MAX_CANDIDATES, sig=None):
+    """Return the titles similar to `text`, most similar first.
+    Args:
+        conn (sqlite3.Connection): A connection to the database.
+        text (str): A title, already folded (see `normalize.fold_title`).
+        limit (int): Maximum number of candidates read from the LSH index.
+        sig (tuple): The signature of `text`, if already computed.
+    Returns:
+        list: (similarity, title id, cluster id) tuples above SIMILARITY."""
+    sig = sig or signature(text)
+    keys = buckets(sig)
+    candidates = conn.execute(f"""
+        SELECT t.id, t.cluster_id, t.minhash
+        FROM titles t
+        WHERE t.id IN (
+            SELECT DISTINCT title_id FROM title_lsh
+            WHERE bucket IN ({", ".join("?" * len(keys))})
+            ORDER BY title_id DESC
+            LIMIT ?
+        )
+    """, (*keys, limit)).fetchall()
+    found = []
+    for title_id, cluster_id, blob in candidates:
+        score = similarity(sig, unpack(blob))
+        if score >= SIMILARITY:
+            found.append((score, title_id, cluster_id))
+    # Most similar first, then the oldest story
+    found.sort(key=lambda item: (-item[0], item[2]))
+    return found
+
+
+def assign_clusters(conn, rows):
+    """Sign, cluster and index new titles. Runs inside the caller's transaction.
+    Args:
+        conn (sqlite3.Connection): The writer connection.
+        rows (list): (id, title_norm) of the new titles, in id order, so a
+            title can join the cluster of one inserted just before it.
+    Returns:
+        int: How many titles joined an existing story."""
+    joined = 0
+    for title_id, text in rows:
+        sig = signature(text)
+        similar = find_similar(conn, text, sig=sig)
+        cluster_id = similar[0][2] if similar else title_id
+        joined += bool(similar)
+        conn.execute(
+            "UPDATE titles SET minhash = ?, cluster_id = ? WHERE id = ?",
+            (pack(sig), cluster_id, title_id),
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO title_lsh (bucket, title_id) VALUES (?, ?)",
+            ((bucket, title_id) for bucket in buckets(sig)),
+        )
+    return joined
@@ -0,0 +1,26 @@
+import hashlib
+import unicodedata
+
+
+def normalize_title(title):
+    """Normalize a title for duplicate detection: collapse whitespace and ignore case."""
+    return " ".join(title.split()).casefold()
+
+
+def title_hash(title):
+    """Return a 64-bit hash of the normalized title, stored in the title_hash column."""
+    if title is None:
+        return None
+    digest = hashlib.blake2b(normalize_title(title).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def fold_title(title):
+    """Return the form of a title used for keyword matching, stored in the title_norm column.
+    Compatibility decomposition (NFKD), accents stripped, casefolded and
+    whitespace collapsed: "  Política  y DÓLAR" -> "politica y dolar"."""
+    if title is None:
+        return None
+    decomposed = unicodedata.normalize("NFKD", title)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return " ".join(stripped.casefold().split())
@@ -1,390 +1,401 @@
-from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Image
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.units import inch
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+import copy
+import hashlib
+import io
+import json
+import threading
+import charts
 
 project_root = Path(__file__).resolve().parent.parent
-img_root = project_root / "resource" / "img"
 pdf_root = project_root / "resource" / "pdf"
-
-pdf_root.mkdir(parents=True, exist_ok=True)
-
-def create_report_pdf_en(report_data):
-    doc = SimpleDocTemplate(str(pdf_root/"Scraping-Report-en.pdf"), pagesize=A4)
-    styles = getSampleStyleSheet()
-    story = []
-
-    # Main document title
-    story.append(Paragraph("News Analysis - Statistical Report", styles['Title']))
-    story.append(Spacer(1, 0.2*inch))
-
-    # Text with variables
-    total_titles = report_data['totals']['total_titles']
-    date_range = report_data['date_range']
-    general_text = (
-        f"This report presents an analysis of the headlines from Argentina's main news media. "
-        f"Scraping was performed on different days and at different times to be as random as possible."
-    )
-    general_text2 = (
-        f"The period covered is from {date_range[0]} to {date_range[1]} and a total of {total_titles} headlines were collected."
-    )
-    story.append(Paragraph(general_text, styles['Normal']))
-    story.append(Paragraph(general_text2, styles['Normal']))
-    story.append(Spacer(0.5, 0.2*inch))
-
-    # Bar chart: Titles per media outlet
-    titles_text = (
-        "The following chart shows the number of headlines scraped for each media outlet. "
-        "This is to get an idea of the amount of data available for each outlet for politics, economy, and tragedy."
-    )
-    story.append(Paragraph("A little context before we begin...", styles['Heading2']))
-    story.append(Paragraph(titles_text, styles['Normal']))
-    story.append(Image((str(img_root/"titles_per_media.png")), width=450, height=300))
-    story.append(Spacer(0.5, 0.2*inch))
-
-    # Politics section
-    story.append(Paragraph("Political Analysis", styles['Heading2']))
-    total_politics = report_data['totals']['politics_titles']
-    category_counts_politics = report_data['category_counts_per_media']
-    max_politics_titles = -1
-    dominant_media_pol_politics = "N/A"
-    for media, counts in category_counts_politics.items():
-        if counts['politics'] > max_politics_titles:
-            max_politics_titles = counts['politics']
-            dominant_media_pol_politics = media
-    # Initialize variables to find the highest percentage
-    max_politics_percentage = -1.0
-    dominant_media_pol_perc = "N/A"
-
-    # Convert titles_per_media to a dictionary for easier access
-    titles_per_media_dict = dict(report_data['titles_per_media'])
-
-    # Iterate over media outlets and their category counts
-    for media, counts in report_data['category_counts_per_media'].items():
-        total_titles_for_media = titles_per_media_dict.get(media, 0)
-
-        # Avoid division by zero
-        if total_titles_for_media > 0:
-            politics_titles = counts['politics']
-            # Calculate the percentage of politics headlines for this outlet
-            politics_percentage = (politics_titles / total_titles_for_media) * 100
-
-            # Compare and update if it is the highest percentage
-            if politics_percentage > max_politics_percentage:
-                max_politics_percentage = politics_percentage
-                dominant_media_pol_perc = media
-    
-    # This text is an example; you should adapt it to match your data
-    politics_text = (
-        f"In the Politics category, approximately {total_politics} headlines were found. "
-        f"The following charts show the gross number of headlines each media outlet dedicates to politics, and also "
-        f"the percentage that politics represents for each outlet relative to its total number of headlines."
-    )
-    politics_text2 = (
-        f"The media outlet that published the most politics headlines is {dominant_media_pol_politics} with a total of {max_politics_titles} headlines. "
-        f"However, if we analyze the percentage that politics represents for each outlet, the one with the biggest focus on politics is {dominant_media_pol_perc} "
-        f"with {max_politics_percentage:.2f}% of its headlines dedicated to this category."
-    )
-    story.append(Paragraph(politics_text, styles['Normal']))
-    story.append(Image(str(img_root/"politics_percentage_count.png"), width=400, height=250))
-    story.append(Spacer(0.5, 0.2*inch))
-    story.append(Image(str(img_root/"politics_percentage.png"), width=400, height=250))
-    story.append(Paragraph(politics_text2, styles['Normal']))
-    story.append(Spacer(0.5, 0.2*inch))
-
-    # Political parties and figures
-    lla_vs_fp_text = (
-        "The following chart shows the number of headlines that mention the two main "
-        "political figures currently in the media, as well as their respective opposing parties.\n"
-        "On one side, La Libertad Avanza with Javier Milei, and on the other, Fuerza Patria with Axel Kicillof."
-    )
-    note = (
-        "Note: Many media outlets tend to refer to the Fuerza Patria sector as Peronismo, Kirchnerismo, or simply La Campora, so it was decided to group them all into the same category."
-    )
-    story.append(Paragraph("La Libertad Avanza vs. Fuerza Patria", styles['Heading2']))
-    story.append(Paragraph(lla_vs_fp_text, styles['Normal']))
-    story.append(Paragraph(note, styles['Normal']))
-    story.append(Image(str(img_root/"lla_fp_percentage.png"), width=400, height=250))
-    story.append(Spacer(0.5, 0.2*inch))
-    story.append(Image(str(img_root/"milei_kicillof_percentage.png"), width=400, height=250))
-    story.append(Spacer(0.5, 0.2*inch))
-
-    # Economy section
-    story.append(Paragraph("Economic Analysis", styles['Heading2']))
-    total_economy = report_data['totals']['economy_titles']
-    category_counts_economy = report_data['category_counts_per_media']
-    max_economy_titles = -1
-    dominant_media_pol_economy = "N/A"
-    for media, counts in category_counts_economy.items():
-        if counts['economy'] > max_economy_titles:
-            max_economy_titles = counts['economy']
-            dominant_media_pol_economy = media
-    # Initialize variables to find the highest percentage
-    max_economy_percentage = -1.0
-    dominant_media_eco_perc = "N/A"
-    # Iterate over media outlets and their category counts
-    for media, counts in report_data['category_counts_per_media'].items():
-        total_titles_for_media = titles_per_media_dict.get(media, 0)
-
-        # Avoid division by zero
-        if total_titles_for_media > 0:
-            economy_titles = counts['economy']
-            # Calculate the percentage of economy headlines for this outlet
-            economy_percentage = (economy_titles / total_titles_for_media) * 100
-
-            # Compare and update if it is the highest percentage
-            if economy_percentage > max_economy_percentage:
-                max_economy_percentage = economy_percentage
-                dominant_media_eco_perc = media
-    economy_text = (
-        f"In the Economy category, approximately {total_economy} headlines were found. "
-        f"The following charts show the gross number of headlines each media outlet dedicates to the economy, and also "
-        f"the percentage that the economy represents for each outlet relative to its total number of headlines."
-    )
-    economy_text2 = (
-        f"The media outlet that published the most economy headlines is {dominant_media_pol_economy} with a total of {max_economy_titles} headlines. "
-        f"However, if we analyze the percentage that the economy represents for each outlet, the one with the biggest focus on the economy is {dominant_media_eco_perc} "
-        f"with {max_economy_percentage:.2f}% of its headlines dedicated to this category."
-    )
-    story.append(Paragraph(economy_text, styles['Normal']))
-    story.append(Image(str(img_root/"economy_percentage_count.png"), width=400, height=250))
-    story.append(Spacer(0.5, 0.2*inch))
-    story.append(Image(str(img_root/"economy_percentage.png"), width=400, height=250))
-    story.append(Paragraph(economy_text2, styles['Normal']))
-    story.append(Spacer(0.5, 0.2*inch))
-
-    # Tragedy section
-    story.append(Paragraph("Tragedy Analysis", styles['Heading2']))
-    total_tragedy = report_data['totals']['tragedy_titles']
-    category_counts_tragedy = report_data['category_counts_per_media']
-    max_tragedy_titles = -1
-    dominant_media_pol_tragedy = "N/A"
-    for media, counts in category_counts_tragedy.items():
-        if counts['tragedy'] > max_tragedy_titles:
-            max_tragedy_titles = counts['tragedy']
-            dominant_media_pol_tragedy = media
-    # Initialize variables to find the highest percentage
-    max_tragedy_percentage = -1.0
-    dominant_media_tra_perc = "N/A"
-    # Iterate over media outlets and their category counts
-    for media, counts in report_data['category_counts_per_media'].items():
-        total_titles_for_media = titles_per_media_dict.get(media, 0)
-
-        # Avoid division by zero
-        if total_titles_for_media > 0:
-            tragedy_titles = counts['tragedy']
-            # Calculate the percentage of tragedy headlines for this outlet
-            tragedy_percentage = (tragedy_titles / total_titles_for_media) * 100
-
-            # Compare and update if it is the highest percentage
-            if tragedy_percentage > max_tragedy_percentage:
-                max_tragedy_percentage = tragedy_percentage
-                dominant_media_tra_perc = media
-    tragedy_text = (
-        f"In the Tragedy category, approximately {total_tragedy} headlines were found. "
-        f"The following charts show the gross number of headlines each media outlet dedicates to tragedies, and also "
-        f"the percentage that tragedies represent for each outlet relative to its total number of headlines."
-    )
-    tragedy_text2 = (
-        f"The media outlet that published the most tragedy headlines is {dominant_media_pol_tragedy} with a total of {max_tragedy_titles} headlines. "
-        f"However, if we analyze the percentage that tragedies represent for each outlet, the one with the biggest focus on tragedies is {dominant_media_tra_perc} "
-        f"with {max_tragedy_percentage:.2f}% of its headlines dedicated to this category."
-    )
-    story.append(Paragraph(tragedy_text, styles['Normal']))
-    story.append(Image(str(img_root/"tragedy_percentage_count.png"), width=400, height=250))
-    story.append(Spacer(0.5, 0.2*inch))
-    story.append(Image(str(img_root/"tragedy_percentage.png"), width=400, height=250))
-    story.append(Paragraph(tragedy_text2, styles['Normal']))
-    story.append(Spacer(0.5, 0.2*inch))
- 
-    doc.build(story)
-
-def create_report_pdf_es(report_data):
-    doc = SimpleDocTemplate(str(pdf_root/"Scraping-Report-es.pdf"), pagesize=A4)
+CACHE_DIR = project_root / "resource" / "cache" / "pdf"
+# Built reports kept in CACHE_DIR, the least recently used are removed
+MAX_CACHED_PDFS = 16
+
+# The charts embedded in the report (see charts.report_figures)
+IMAGES = [
+    "titles_per_media", "politics_percentage_count", "politics_percentage", "lla_fp_percentage",
+    "milei_kicillof_percentage", "economy_percentage_count", "economy_percentage",
+    "tragedy_percentage_count", "tragedy_percentage",
+]
+CATEGORIES = ["politics", "economy", "tragedy"]
+
+# The text of the report in every language. The per-category texts are filled
+# with the metrics of `report_metrics`.
+LANG = {
+    "en": {
+        "file_name": "Scraping-Report-en.pdf",
+        "title": "News Analysis - Statistical Report",
+        "intro": (
+            "This report presents an analysis of the headlines from Argentina's main news media. "
+            "Scraping was performed on different days and at different times to be as random as possible."
+        ),
+        "period": "The period covered is from {start} to {end} and a total of {total_titles} headlines were collected.",
+        "context_heading": "A little context before we begin...",
+        "context": (
+            "The following chart shows the number of headlines scraped for each media outlet. "
+            "This is to get an idea of the amount of data available for each outlet for politics, economy, and tragedy."
+        ),
+        "parties_heading": "La Libertad Avanza vs. Fuerza Patria",
+        "parties": (
+            "The following chart shows the number of headlines that mention the two main "
+            "political figures currently in the media, as well as their respective opposing parties.\n"
+            "On one side, La Libertad Avanza with Javier Milei, and on the other, Fuerza Patria with Axel Kicillof."
+        ),
+        "parties_note": (
+            "Note: Many media outlets tend to refer to the Fuerza Patria sector as Peronismo, Kirchnerismo, or simply La Campora, so it was decided to group them all into the same category."
+        ),
+        "politics": {
+            "heading": "Political Analysis",
+            "text": (
+                "In the Politics category, approximately {total} headlines were found. "
+                "The following charts show the gross number of headlines each media outlet dedicates to politics, and also "
+                "the percentage that politics represents for each outlet relative to its total number of headlines."
+            ),
+            "dominant": (
+                "The media outlet that published the most politics headlines is {top_media} with a total of {top_count} headlines. "
+                "However, if we analyze the percentage that politics represents for each outlet, the one with the biggest focus on politics is {focus_media} "
+                "with {focus_percentage:.2f}% of its headlines dedicated to this category."
+            ),
+        },
+        "economy": {
+            "heading": "Economic Analysis",
+            "text": (
+                "In the Economy category, approximately {total} headlines were found. "
+                "The following charts show the gross number of headlines each media outlet dedicates to the economy, and also "
+                "the percentage that the economy represents for each outlet relative to its total number of headlines."
+            ),
+            "dominant": (
+                "The media outlet that published the most economy headlines is {top_media} with a total of {top_count} headlines. "
+                "However, if we analyze the percentage that the economy represents for each outlet, the one with the biggest focus on the economy is {focus_media} "
+                "with {focus_percentage:.2f}% of its headlines dedicated to this category."
+            ),
+        },
+        "tragedy": {
+            "heading": "Tragedy Analysis",
+            "text": (
+                "In the Tragedy category, approximately {total} headlines were found. "
+                "The following charts show the gross number of headlines each media outlet dedicates to tragedies, and also "
+                "the percentage that tragedies represent for each outlet relative to its total number of headlines."
+            ),
+            "dominant": (
+                "The media outlet that published the most tragedy headlines is {top_media} with a total of {top_count} headlines. "
+                "However, if we analyze the percentage that tragedies represent for each outlet, the one with the biggest focus on tragedies is {focus_media} "
+                "with {focus_percentage:.2f}% of its headlines dedicated to this category."
+            ),
+        },
+    },
+    "es": {
+        "file_name": "Scraping-Report-es.pdf",
+        "title": "Análisis de Noticias - Informe Estadístico",
+        "intro": (
+            "Este informe presenta un análisis de los titulares de los principales medios de noticias de Argentina. "
+            "Se realizó un 'scraping' en diferentes días y horarios para ser lo más aleatorio posible."
+        ),
+        "period": "El período cubierto es desde {start} hasta {end} y se recolectó un total de {total_titles} titulares.",
+        "context_heading": "Un poco de contexto antes de empezar...",
+        "context": (
+            "El siguiente gráfico muestra el número de titulares extraídos para cada medio de noticias. "
+            "Esto es para tener una idea de la cantidad de datos disponibles para cada medio sobre política, economía y tragedia."
+        ),
+        "parties_heading": "La Libertad Avanza vs. Fuerza Patria",
+        "parties": (
+            "El siguiente gráfico muestra el número de titulares que mencionan a las dos principales "
+            "figuras políticas actualmente en los medios, así como a sus respectivos partidos opuestos.\n"
+            "Por un lado, La Libertad Avanza con Javier Milei, y por el otro, Fuerza Patria con Axel Kicillof."
+        ),
+        "parties_note": (
+            "Nota: Muchos medios tienden a referirse al sector de Fuerza Patria como Peronismo, Kirchnerismo, o simplemente La Cámpora, por lo que se decidió agruparlos a todos en la misma categoría."
+        ),
+        "politics": {
+            "heading": "Análisis Político",
+            "text": (
+                "En la categoría de Política, se encontraron aproximadamente {total} titulares. "
+                "Los siguientes gráficos muestran el número bruto de titulares que cada medio dedica a la política, y también "
+                "el porcentaje que la política representa para cada medio en relación con su número total de titulares."
+            ),
+            "dominant": (
+                "El medio que publicó más titulares de política es **{top_media}** con un total de **{top_count}** titulares. "
+                "Sin embargo, si analizamos el porcentaje que la política representa para cada medio, el que tiene el mayor enfoque en política es **{focus_media}** "
+                "con un **{focus_percentage:.2f}%** de sus titulares dedicados a esta categoría."
+            ),
+        },
+        "economy": {
+            "heading": "Análisis Económico",
+            "text": (
+                "En la categoría de Economía, se encontraron aproximadamente **{total}** titulares. "
+                "Los siguientes gráficos muestran el número bruto de titulares que cada medio dedica a la economía, y también "
+                "el porcentaje que la economía representa para cada medio en relación con su número total de titulares."
+            ),
+            "dominant": (
+                "El medio que publicó más titulares de economía es **{top_media}** con un total de **{top_count}** titulares. "
+                "Sin embargo, si analizamos el porcentaje que la economía representa para cada medio, el que tiene el mayor enfoque en la economía es **{focus_media}** "
+                "con un **{focus_percentage:.2f}%** de sus titulares dedicados a esta categoría."
+            ),
+        },
+        "tragedy": {
+            "heading": "Análisis de Tragedia",
+            "text": (
+                "En la categoría de Tragedia, se encontraron aproximadamente **{total}** titulares. "
+                "Los siguientes gráficos muestran el número bruto de titulares que cada medio dedica a las tragedias, y también "
+                "el porcentaje que las tragedias representan para cada medio en relación con su número total de titulares."
+            ),
+            "dominant": (
+                "El medio que publicó más titulares de tragedia es **{top_media}** con un total de **{top_count}** titulares. "
+                "Sin embargo, si analizamos el porcentaje que las tragedias representan para cada medio, el que tiene el mayor enfoque en las tragedias es **{focus_media}** "
+                "con un **{focus_percentage:.2f}%** de sus titulares dedicados a esta categoría."
+            ),
+        },
+    },
+}
+LANGUAGES = list(LANG)
+
+def report_metrics(report_data):
+    """Compute once the figures quoted by the report, whatever its language.
+    Args:
+        report_data (dict): The report, as returned by clear_stats.stats().
+    Returns:
+        dict: start, end, total_titles and, for every category, its total, the
+            outlet with the most headlines (top_media, top_count) and the one
+            where it weighs the most (focus_media, focus_percentage)."""
+    totals = report_data['totals']
+    titles_per_media = dict(report_data['titles_per_media'])
+    counts_per_media = report_data['category_counts_per_media']
+    metrics = {
+        "start": report_data['date_range'][0],
+        "end": report_data['date_range'][1],
+        "total_titles": totals['total_titles'],
+    }
+    for category in CATEGORIES:
+        # The first outlet wins ties, as N/A does when there is no outlet
+        top_media, top_count = "N/A", -1
+        focus_media, focus_percentage = "N/A", -1.0
+        for media, counts in counts_per_media.items():
+            if counts[category] > top_count:
+                top_media, top_count = media, counts[category]
+            total = titles_per_media.get(media, 0)
+            # Avoid division by zero
+            if total > 0 and counts[category] / total * 100 > focus_percentage:
+                focus_media, focus_percentage = media, counts[category] / total * 100
+        metrics[category] = {
+            "total": totals[f"{category}_titles"],
+            "top_media": top_media,
+            "top_count": top_count,
+            "focus_media": focus_media,
+            "focus_percentage": focus_percentage,
+        }
+    return metrics
+
+def report_images(report_data, images=None):
+    """Return the report charts as PNG bytes: the ones given, or rendered from the report.
+    Args:
+        report_data (dict): The report, as returned by clear_stats.stats().
+        images (dict): image name -> PNG bytes or BytesIO, as the dashboard
+            already rendered them. If None, the charts are drawn and rendered
+            here (see charts.report_images).
+    Returns:
+        dict: image name -> PNG bytes."""
+    if images is None:
+        images = charts.report_images(report_data)
+    return {name: images[name].getvalue() if hasattr(images[name], "getvalue") else bytes(images[name]) for name in IMAGES}
+
+_reportlab_loaded = False
+
+def load_reportlab():
+    """Import and configure ReportLab, once per process.
+    It is only needed to build a report: serving one from the cache, or
+    importing this module, does not load it."""
+    global _reportlab_loaded
+    if not _reportlab_loaded:
+        from reportlab import rl_config
+        # Image streams are written binary (Flate only). ReportLab adds an ASCII85 pass
+        # by default, which is pure Python here and took more than half of a build.
+        rl_config.useA85 = 0
+        _reportlab_loaded = True
+
+def image_flowables(images):
+    """Turn PNG bytes into Image flowables, decoded once for every report of a run.
+    Stories use copies (see `report_story`): ReportLab marks the flowables it
+    lays out, but the copies share the decoded image."""
+    load_reportlab()
+    from reportlab.platypus import Image
+
+    sizes = {"titles_per_media": (450, 300)}
+    return {name: Image(io.BytesIO(data), *sizes.get(name, (400, 250))) for name, data in images.items()}
+
+def report_story(lang, metrics, flowables):
+    """Lay out the report in `lang`.
+    Args:
+        lang (str): A key of LANG.
+        metrics (dict): As returned by report_metrics().
+        flowables (dict): As returned by image_flowables().
+    Returns:
+        list: The flowables of the document."""
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import inch
+    from reportlab.platypus import Paragraph, Spacer
+
+    text = LANG[lang]
     styles = getSampleStyleSheet()
-    story = []
-
-    # Título principal del documento
-    story.append(Paragraph("Análisis de Noticias - Informe Estadístico", styles['Title']))
-    story.append(Spacer(1, 0.2*inch))
-
-    # Texto con variables
-    total_titles = report_data['totals']['total_titles']
-    date_range = report_data['date_range']
-    general_text = (
-        f"Este informe presenta un análisis de los titulares de los principales medios de noticias de Argentina. "
-        f"Se realizó un 'scraping' en diferentes días y horarios para ser lo más aleatorio posible."
-    )
-    general_text2 = (
-        f"El período cubierto es desde {date_range[0]} hasta {date_range[1]} y se recolectó un total de {total_titles} titulares."
-    )
-    story.append(Paragraph(general_text, styles['Normal']))
-    story.append(Paragraph(general_text2, styles['Normal']))
-    story.append(Spacer(0.5, 0.2*inch))
-
-    # Gráfico de barras: Títulos por medio de noticias
-    titles_text = (
-        "El siguiente gráfico muestra el número de titulares extraídos para cada medio de noticias. "
-        "Esto es para tener una idea de la cantidad de datos disponibles para cada medio sobre política, economía y tragedia."
-    )
-    story.append(Paragraph("Un poco de contexto antes de empezar...", styles['Heading2']))
-    story.append(Paragraph(titles_text, styles['Normal']))
-    story.append(Image((str(img_root/"titles_per_media.png")), width=450, height=300))
-    story.append(Spacer(0.5, 0.2*inch))
-
-    # Sección de Política
-    story.append(Paragraph("Análisis Político", styles['Heading2']))
-    total_politics = report_data['totals']['politics_titles']
-    category_counts_politics = report_data['category_counts_per_media']
-    max_politics_titles = -1
-    dominant_media_pol_politics = "N/A"
-    for media, counts in category_counts_politics.items():
-        if counts['politics'] > max_politics_titles:
-            max_politics_titles = counts['politics']
-            dominant_media_pol_politics = media
-    # Inicializar variables para encontrar el porcentaje más alto
-    max_politics_percentage = -1.0
-    dominant_media_pol_perc = "N/A"
-
-    # Convertir titles_per_media a un diccionario para facilitar el acceso
-    titles_per_media_dict = dict(report_data['titles_per_media'])
-
-    # Iterar sobre los medios y sus recuentos por categoría
-    for media, counts in report_data['category_counts_per_media'].items():
-        total_titles_for_media = titles_per_media_dict.get(media, 0)
-
-        # Evitar la división por cero
-        if total_titles_for_media > 0:
-            politics_titles = counts['politics']
-            # Calcular el porcentaje de titulares de política para este medio
-            politics_percentage = (politics_titles / total_titles_for_media) * 100
-
-            # Comparar y actualizar si es el porcentaje más alto
-            if politics_percentage > max_politics_percentage:
-                max_politics_percentage = politics_percentage
-                dominant_media_pol_perc = media
-
-    politics_text = (
-        f"En la categoría de Política, se encontraron aproximadamente {total_politics} titulares. "
-        f"Los siguientes gráficos muestran el número bruto de titulares que cada medio dedica a la política, y también "
-        f"el porcentaje que la política representa para cada medio en relación con su número total de titulares."
-    )
-    politics_text2 = (
-        f"El medio que publicó más titulares de política es **{dominant_media_pol_politics}** con un total de **{max_politics_titles}** titulares. "
-        f"Sin embargo, si analizamos el porcentaje que la política representa para cada medio, el que tiene el mayor enfoque en política es **{dominant_media_pol_perc}** "
-        f"con un **{max_politics_percentage:.2f}%** de sus titulares dedicados a esta categoría."
-    )
-    story.append(Paragraph(politics_text, styles['Normal']))
-    story.append(Image(str(img_root/"politics_percentage_count.png"), width=400, height=250))
-    story.append(Spacer(0.5, 0.2*inch))
-    story.append(Image(str(img_root/"politics_percentage.png"), width=400, height=250))
-    story.append(Paragraph(politics_text2, styles['Normal']))
-    story.append(Spacer(0.5, 0.2*inch))
-
-    # Partidos y figuras políticas
-    lla_vs_fp_text = (
-        "El siguiente gráfico muestra el número de titulares que mencionan a las dos principales "
-        "figuras políticas actualmente en los medios, así como a sus respectivos partidos opuestos.\n"
-        "Por un lado, La Libertad Avanza con Javier Milei, y por el otro, Fuerza Patria con Axel Kicillof."
-    )
-    note = (
-        "Nota: Muchos medios tienden a referirse al sector de Fuerza Patria como Peronismo, Kirchnerismo, o simplemente La Cámpora, por lo que se decidió agruparlos a todos en la misma categoría."
-    )
-    story.append(Paragraph("La Libertad Avanza vs. Fuerza Patria", styles['Heading2']))
-    story.append(Paragraph(lla_vs_fp_text, styles['Normal']))
-    story.append(Paragraph(note, styles['Normal']))
-    story.append(Image(str(img_root/"lla_fp_percentage.png"), width=400, height=250))
-    story.append(Spacer(0.5, 0.2*inch))
-    story.append(Image(str(img_root/"milei_kicillof_percentage.png"), width=400, height=250))
-    story.append(Spacer(0.5, 0.2*inch))
-
-    # Sección de Economía
-    story.append(Paragraph("Análisis Económico", styles['Heading2']))
-    total_economy = report_data['totals']['economy_titles']
-    category_counts_economy = report_data['category_counts_per_media']
-    max_economy_titles = -1
-    dominant_media_pol_economy = "N/A"
-    for media, counts in category_counts_economy.items():
-        if counts['economy'] > max_economy_titles:
-            max_economy_titles = counts['economy']
-            dominant_media_pol_economy = media
-    # Inicializar variables para encontrar el porcentaje más alto
-    max_economy_percentage = -1.0
-    dominant_media_eco_perc = "N/A"
-    # Iterar sobre los medios y sus recuentos por categoría
-    for media, counts in report_data['category_counts_per_media'].items():
-        total_titles_for_media = titles_per_media_dict.get(media, 0)
-
-        # Evitar la división por cero
-        if total_titles_for_media > 0:
-            economy_titles = counts['economy']
-            # Calcular el porcentaje de titulares de economía para este medio
-            economy_percentage = (economy_titles / total_titles_for_media) * 100
-
-            # Comparar y actualizar si es el porcentaje más alto
-            if economy_percentage > max_economy_percentage:
-                max_economy_percentage = economy_percentage
-                dominant_media_eco_perc = media
-    economy_text = (
-        f"En la categoría de Economía, se encontraron aproximadamente **{total_economy}** titulares. "
-        f"Los siguientes gráficos muestran el número bruto de titulares que cada medio dedica a la economía, y también "
-        f"el porcentaje que la economía representa para cada medio en relación con su número total de titulares."
-    )
-    economy_text2 = (
-        f"El medio que publicó más titulares de economía es **{dominant_media_pol_economy}** con un total de **{max_economy_titles}** titulares. "
-        f"Sin embargo, si analizamos el porcentaje que la economía representa para cada medio, el que tiene el mayor enfoque en la economía es **{dominant_media_eco_perc}** "
-        f"con un **{max_economy_percentage:.2f}%** de sus titulares dedicados a esta categoría."
-    )
-    story.append(Paragraph(economy_text, styles['Normal']))
-    story.append(Image(str(img_root/"economy_percentage_count.png"), width=400, height=250))
-    story.append(Spacer(0.5, 0.2*inch))
-    story.append(Image(str(img_root/"economy_percentage.png"), width=400, height=250))
-    story.append(Paragraph(economy_text2, styles['Normal']))
-    story.append(Spacer(0.5, 0.2*inch))
-
-    # Sección de Tragedia
-    story.append(Paragraph("Análisis de Tragedia", styles['Heading2']))
-    total_tragedy = report_data['totals']['tragedy_titles']
-    category_counts_tragedy = report_data['category_counts_per_media']
-    max_tragedy_titles = -1
-    dominant_media_pol_tragedy = "N/A"
-    for media, counts in category_counts_tragedy.items():
-        if counts['tragedy'] > max_tragedy_titles:
-            max_tragedy_titles = counts['tragedy']
-            dominant_media_pol_tragedy = media
-    # Inicializar variables para encontrar el porcentaje más alto
-    max_tragedy_percentage = -1.0
-    dominant_media_tra_perc = "N/A"
-    # Iterar sobre los medios y sus recuentos por categoría
-    for media, counts in report_data['category_counts_per_media'].items():
-        total_titles_for_media = titles_per_media_dict.get(media, 0)
-
-        # Evitar la división por cero
-        if total_titles_for_media > 0:
-            tragedy_titles = counts['tragedy']
-            # Calcular el porcentaje de titulares de tragedia para este medio
-            tragedy_percentage = (tragedy_titles / total_titles_for_media) * 100
-
-            # Comparar y actualizar si es el porcentaje más alto
-            if tragedy_percentage > max_tragedy_percentage:
-                max_tragedy_percentage = tragedy_percentage
-                dominant_media_tra_perc = media
-    tragedy_text = (
-        f"En la categoría de Tragedia, se encontraron aproximadamente **{total_tragedy}** titulares. "
-        f"Los siguientes gráficos muestran el número bruto de titulares que cada medio dedica a las tragedias, y también "
-        f"el porcentaje que las tragedias representan para cada medio en relación con su número total de titulares."
-    )
-    tragedy_text2 = (
-        f"El medio que publicó más titulares de tragedia es **{dominant_media_pol_tragedy}** con un total de **{max_tragedy_titles}** titulares. "
-        f"Sin embargo, si analizamos el porcentaje que las tragedias representan para cada medio, el que tiene el mayor enfoque en las tragedias es **{dominant_media_tra_perc}** "
-        f"con un **{max_tragedy_percentage:.2f}%** de sus titulares dedicados a esta categoría."
-    )
-    story.append(Paragraph(tragedy_text, styles['Normal']))
-    story.append(Image(str(img_root/"tragedy_percentage_count.png"), width=400, height=250))
-    story.append(Spacer(0.5, 0.2*inch))
-    story.append(Image(str(img_root/"tragedy_percentage.png"), width=400, height=250))
-    story.append(Paragraph(tragedy_text2, styles['Normal']))
-    story.append(Spacer(0.5, 0.2*inch))
-
-    doc.build(story)
\ No newline at end of file
+    image = lambda name: copy.copy(flowables[name])
+    story = [
+        Paragraph(text["title"], styles['Title']),
+        Spacer(1, 0.2*inch),
+        Paragraph(text["intro"], styles['Normal']),
+        Paragraph(text["period"].format(**metrics), styles['Normal']),
+        Spacer(0.5, 0.2*inch),
+        Paragraph(text["context_heading"], styles['Heading2']),
+        Paragraph(text["context"], styles['Normal']),
+        image("titles_per_media"),
+        Spacer(0.5, 0.2*inch),
+    ]
+    for category in CATEGORIES:
+        section = text[category]
+        story += [
+            Paragraph(section["heading"], styles['Heading2']),
+            Paragraph(section["text"].format(**metrics[category]), styles['Normal']),
+            image(f"{category}_percentage_count"),
+            Spacer(0.5, 0.2*inch),
+            image(f"{category}_percentage"),
+            Paragraph(section["dominant"].format(**metrics[category]), styles['Normal']),
+            Spacer(0.5, 0.2*inch),
+        ]
+        if category == "politics":
+            # Political parties and figures
+            story += [
+                Paragraph(text["parties_heading"], styles['Heading2']),
+                Paragraph(text["parties"], styles['Normal']),
+                Paragraph(text["parties_note"], styles['Normal']),
+                image("lla_fp_percentage"),
+                Spacer(0.5, 0.2*inch),
+                image("milei_kicillof_percentage"),
+                Spacer(0.5, 0.2*inch),
+            ]
+    return story
+
+def _build(lang, metrics, flowables):
+    load_reportlab()
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import SimpleDocTemplate
+
+    buffer = io.BytesIO()
+    SimpleDocTemplate(buffer, pagesize=A4).build(report_story(lang, metrics, flowables))
+    return buffer.getvalue()
+
+def _build_worker(lang, metrics, images):
+    return _build(lang, metrics, image_flowables(images))
+
+def build_reports(report_data, langs=None, images=None, workers=1):
+    """Build the report in several languages in one run.
+    The metrics are computed and the images decoded once for all of them.
+    With more than one worker, the languages are built in parallel processes
+    (each one decodes the images it embeds).
+    Args:
+        report_data (dict): The report, as returned by clear_stats.stats().
+        langs (list): Keys of LANG (all of them by default).
+        images (dict): image name -> PNG bytes or BytesIO (rendered from the
+            report by default, see `report_images`). Nothing is read from or
+            written to disk.
+        workers (int): Number of worker processes.
+    Returns:
+        dict: lang -> PDF bytes."""
+    langs = list(langs or LANGUAGES)
+    for lang in langs:
+        if lang not in LANG:
+            raise ValueError(f"Unknown report language: {lang!r} (expected one of {', '.join(LANG)})")
+    metrics = report_metrics(report_data)
+    images = report_images(report_data, images)
+    if workers > 1 and len(langs) > 1:
+        with ProcessPoolExecutor(min(workers, len(langs))) as pool:
+            return dict(zip(langs, pool.map(_build_worker, langs, [metrics] * len(langs), [images] * len(langs))))
+    flowables = image_flowables(images)
+    return {lang: _build(lang, metrics, flowables) for lang in langs}
+
+def write_report(report_data, lang, output=None, images=None):
+    """Build the report in `lang` into `output` (resource/pdf/<file name> by default)."""
+    data = build_reports(report_data, [lang], images)[lang]
+    if output is None:
+        pdf_root.mkdir(parents=True, exist_ok=True)
+        output = pdf_root / LANG[lang]["file_name"]
+    Path(output).write_bytes(data)
+
+def create_report_pdf_en(report_data, output=None, images=None):
+    write_report(report_data, "en", output, images)
+
+def create_report_pdf_es(report_data, output=None, images=None):
+    write_report(report_data, "es", output, images)
+
+# lang -> (key, PDF bytes) of the last report served
+_artifacts = {}
+_build_lock = threading.Lock()
+
+def report_key(report_data, lang, images):
+    """Return the hash of what a report is made of: its data, its language and its images.
+    Args:
+        report_data (dict): The report, as returned by clear_stats.stats().
+        lang (str): "en" or "es".
+        images (dict): image name -> PNG bytes.
+    Returns:
+        str: A sha256 hex digest."""
+    digest = hashlib.sha256(lang.encode("utf-8"))
+    digest.update(json.dumps(report_data, sort_keys=True, default=str).encode("utf-8"))
+    for name in IMAGES:
+        digest.update(images[name])
+    return digest.hexdigest()
+
+def report_pdfs(report_data, langs=None, images=None, cache_dir=CACHE_DIR):
+    """Return the PDF report in every language of `langs`, building only the ones whose data or charts changed.
+    Builds are cached in memory and in `cache_dir/<key>.pdf` (the last
+    MAX_CACHED_PDFS used), so a rerun of the dashboard (or a restart) serves
+    the bytes already built. The missing
+    languages are built together (see `build_reports`).
+    Args:
+        report_data (dict): The report, as returned by clear_stats.stats().
+        langs (list): Keys of LANG (all of them by default).
+        images (dict): image name -> PNG bytes or BytesIO (rendered from the
+            report by default, see `report_images`).
+        cache_dir (Path): Where the built reports are kept (None keeps them
+            in memory only, and the filesystem is not used at all).
+    Returns:
+        dict: lang -> PDF bytes."""
+    langs = list(langs or LANGUAGES)
+    for lang in langs:
+        if lang not in LANG:
+            raise ValueError(f"Unknown report language: {lang!r} (expected one of {', '.join(LANG)})")
+    images = report_images(report_data, images)
+    keys = {lang: report_key(report_data, lang, images) for lang in langs}
+    found = {lang: _artifacts[lang][1] for lang in langs if _artifacts.get(lang, (None,))[0] == keys[lang]}
+    if len(found) == len(langs):
+        return found
+    # One build at a time: sessions asking for the same report wait for the first one
+    with _build_lock:
+        for lang in langs:
+            cached = _artifacts.get(lang)
+            if lang not in found and cached and cached[0] == keys[lang]:
+                found[lang] = cached[1]
+            elif lang not in found and cache_dir is not None:
+                data = charts.read_cached(Path(cache_dir) / f"{keys[lang]}.pdf")
+                if data is not None:
+                    found[lang] = data
+        missing = [lang for lang in langs if lang not in found]
+        if missing:
+            found.update(build_reports(report_data, missing, images))
+            if cache_dir is not None:
+                Path(cache_dir).mkdir(parents=True, exist_ok=True)
+                for lang in missing:
+                    charts.write_atomic(found[lang], Path(cache_dir) / f"{keys[lang]}.pdf")
+                charts.prune_cache(cache_dir, "*.pdf", MAX_CACHED_PDFS)
+        for lang in langs:
+            _artifacts[lang] = (keys[lang], found[lang])
+    return found
+
+def report_pdf(report_data, lang, images=None):
+    """Return the PDF report in `lang` (see `report_pdfs`).
+    Args:
+        report_data (dict): The report, as returned by clear_stats.stats().
+        lang (str): "en" or "es".
+        images (dict): image name -> PNG bytes (rendered from the report by default).
+    Returns:
+        bytes: The PDF document."""
+    return report_pdfs(report_data, [lang], images)[lang]
@@ -0,0 +1,104 @@
+import re
+from functools import lru_cache
+
+# Extraction profile of each outlet, keyed like `scraping.links`.
+# Selectors are simple CSS compounds: "tag", ".class" or "tag.class.other".
+#   headlines: elements whose text is a headline
+#   exclude:   subtrees that are never read (menus, footers, promos...)
+#   ignore:    elements inside a headline whose text is dropped (kickers)
+#   min_len / max_len: length limits of a valid headline
+#   drop:      regular expressions of texts that are not news
+DEFAULT_PROFILE = {
+    "headlines": ["h1", "h2", "h3"],
+    "exclude": [],
+    "ignore": [],
+    "min_len": 15,
+    "max_len": None,
+    "drop": [],
+}
+
+PROFILES = {
+    'TN': {
+        "headlines": ["h1.card__headline", "h2.card__headline", "h3.card__headline"],
+        "exclude": ["header", "nav", "footer", ".newsletter"],
+        "max_len": 250,
+    },
+    'C5N': {
+        "headlines": ["h1.card-title", "h2.card-title", "h3.card-title"],
+        "exclude": ["header", "nav", "footer"],
+        "max_len": 250,
+    },
+    'LN': {
+        "headlines": ["h1.com-title", "h2.com-title", "h3.com-title"],
+        "exclude": ["header", "nav", "footer", ".club"],
+        "ignore": [".com-volanta"],
+        "max_len": 250,
+        "drop": [r"^Opinión y análisis$"],
+    },
+    'Clarin': {
+        "headlines": ["h1.title", "h2.title", "h3.title"],
+        "exclude": ["header", "nav", "footer"],
+        "max_len": 250,
+    },
+}
+
+
+class CompiledProfile:
+    """An extraction profile with its selectors and patterns ready to match.
+    Args:
+        spec (dict): The profile, with the keys of `DEFAULT_PROFILE`."""
+
+    def __init__(self, spec):
+        spec = {**DEFAULT_PROFILE, **spec}
+        self.headlines = [compile_selector(s) for s in spec["headlines"]]
+        self.exclude = [compile_selector(s) for s in spec["exclude"]]
+        self.ignore = [compile_selector(s) for s in spec["ignore"]]
+        self.min_len = spec["min_len"]
+        self.max_len = spec["max_len"]
+        self.drop = re.compile("|".join(f"(?:{p})" for p in spec["drop"])) if spec["drop"] else None
+        # Tags that can start a headline, to reject most elements with one set lookup
+        self.headline_tags = {tag for tag, _ in self.headlines}
+
+    def is_headline(self, tag, classes):
+        return _matches(self.headlines, tag, classes)
+
+    def is_excluded(self, tag, classes):
+        return _matches(self.exclude, tag, classes)
+
+    def is_ignored(self, tag, classes):
+        return _matches(self.ignore, tag, classes)
+
+    def accepts(self, text):
+        """Return True if `text` passes the length limits and drop patterns."""
+        if len(text) <= self.min_len:
+            return False
+        if self.max_len is not None and len(text) > self.max_len:
+            return False
+        return not (self.drop and self.drop.search(text))
+
+
+def compile_selector(selector):
+    """Compile a "tag.class" selector into (tag or None, frozenset of classes)."""
+    tag, *classes = selector.strip().split(".")
+    return (tag.lower() or None, frozenset(classes))
+
+
+def _matches(selectors, tag, classes):
+    for sel_tag, sel_classes in selectors:
+        if (sel_tag is None or sel_tag == tag) and sel_classes <= classes:
+            return True
+    return False
+
+
+@lru_cache(maxsize=None)
+def get_profile(outlet=None):
+    """Return the compiled profile of `outlet` (the default profile if it has none).
+    Profiles are compiled once and cached."""
+    return CompiledProfile(PROFILES.get(outlet, {}))
+
+
+def compile_profiles():
+    """Compile every profile up front, so extraction never pays for it."""
+    for outlet in PROFILES:
+        get_profile(outlet)
+    get_profile(None)
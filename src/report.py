@@ -0,0 +1,60 @@
+import argparse
+from pathlib import Path
+import db
+
+# The PDF reports, without the dashboard: stats -> charts -> PDFs in one process.
+# Plotly, Kaleido, pandas and ReportLab are imported only once a report is
+# built, so `--help` and a misspelled option answer right away.
+
+project_root = Path(__file__).resolve().parent.parent
+pdf_root = project_root / "resource" / "pdf"
+
+
+def write_reports(report, images, output=pdf_root, langs=None, workers=1):
+    """Build the PDF report in every language and write it to `output`.
+    Args:
+        report (dict): As returned by clear_stats.stats().
+        images (dict): image name -> PNG bytes (see charts.report_images).
+        output (str | Path): The folder the PDFs are written to.
+        langs (list): Report languages, keys of pdf_create.LANG (all of them by default).
+        workers (int): Processes building the languages in parallel.
+    Returns:
+        list: The paths of the PDF files written."""
+    import charts
+    import pdf_create as pc
+
+    pdfs = pc.build_reports(report, langs, images, workers=workers)
+    output = Path(output)
+    output.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for lang, data in pdfs.items():
+        path = output / pc.LANG[lang]["file_name"]
+        charts.write_atomic(data, path)
+        paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write the PDF reports from the current data, without the dashboard.")
+    db.add_db_argument(parser)
+    parser.add_argument("--output", default=str(pdf_root), help="folder the PDF files are written to")
+    parser.add_argument("--lang", action="append", choices=["en", "es"], help="report language (repeat it for several; default: all)")
+    parser.add_argument("--workers", type=int, default=1, help="processes building the languages in parallel")
+    args = parser.parse_args(argv)
+
+    import charts
+    import clear_stats as cs
+
+    report = cs.stats(args.db)
+    try:
+        # Every chart in one batch through the Kaleido session, kept in memory
+        images = charts.report_images(report)
+    except RuntimeError as error:
+        # Kaleido cannot render without Chrome (install it with `plotly_get_chrome`)
+        parser.exit(1, f"Report: the charts could not be rendered.\n{str(error).strip()}\n")
+    for path in write_reports(report, images, args.output, args.lang, args.workers):
+        print(f"✅ Report: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,17 @@
-import requests
-from bs4 import BeautifulSoup
-from data_base import save_titles
+import argparse
+import random
+import signal
+import threading
+import time
+import data_base
+import db
+from extractors import EXTRACTORS, get_extractor
+from fetcher import NOT_MODIFIED, FetchEngine
+from http_cache import HttpCache
+from profiles import PROFILES, compile_profiles
+
+# Shared engine: one keep-alive pool per outlet host
+engine = FetchEngine(max_concurrency=8, per_host=2, timeout=10)
 
 def get_html(url):
     """Fetch the HTML content of a given URL.
@@ -9,45 +20,31 @@ def get_html(url):
     Returns:
         str: The HTML content of the page or None if the request fails."""
     
-    try:
-        # User-Agent header to mimic a browser request
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-
-        # Verify if the request was successful
-        if response.status_code == 200:
-            return response.text
-        else:
-            print(f"Failed to retrieve the page: Status code {response.status_code}")
-            return None
-    except requests.RequestException as e:
-        print(f"An error occurred while fetching the page: {e}")
-        return None
+    return engine.get(url)
+
+
+def get_all_html(urls):
+    """Fetch the HTML content of several URLs concurrently.
+    Args:
+        urls (iterable): The URLs to fetch.
+    Returns:
+        dict: URL -> HTML content, or None for the pages that failed."""
+    
+    return engine.fetch_all(urls)
 
 
 # Extracting news titles from TN (Todo Noticias), C5N (Canal 5 Noticias), LN (La Nación), and Clarin
-def extract_news_titles(html):
+def extract_news_titles(html, outlet=None, backend="fast"):
     """Extract news titles from the HTML content.
     Args:
         html (str): The HTML content of the page.
+        outlet (str): The key of the outlet in `links`, used to pick its
+            extraction profile. If None, the generic profile is used.
+        backend (str): The extractor to use, see `extractors.EXTRACTORS`.
     Returns:
         list: A list of news titles."""
     
-    soup = BeautifulSoup(html, 'html.parser')
-    titles = []
-    
-    # Assuming news titles are within <h2> tags with a specific class
-    for title in soup.find_all(['h1','h2','h3']):
-       if title.text.strip() and len(title.text.strip()) > 15:
-           titles.append(title.text.strip())
-    
-    for element in soup.select('card_headline'):
-        if element.text.strip() and element.text.strip() not in titles:
-            titles.append(element.text.strip())
-    
-    return titles
+    return get_extractor(backend)(html, outlet)
 
 links = {
     'TN': 'https://tn.com.ar/',
@@ -56,13 +53,165 @@ links = {
     'Clarin': 'https://www.clarin.com/'
 }
 
-for key, url in links.items():
-    html = get_html(url)
-    if html:
-        titles = extract_news_titles(html)
-        if titles:
-            print(f"The scraping of page {key} was successful")
-            print(f"Number of titles found: {len(titles)}")
-            save_titles(key, titles)
-        else:
-            print(f"No titles found on page {key}")
+
+class Crawler:
+    """Scrape the news portals once or on a schedule.
+
+    The crawler keeps its HTTP engine and its database writer open between
+    runs, so a resident process pays the connection setup only once.
+    Args:
+        links (dict): Outlet name -> homepage URL.
+        db_path (str | Path): The database file the titles are saved to
+            (see `db.resolve_db_path`).
+        fetch_engine (FetchEngine): The engine used to download the pages.
+        cache (HttpCache): Validator cache used to skip unchanged homepages.
+            Pass False to always download and parse every page.
+        extractor (str): The headline extractor backend."""
+
+    def __init__(self, links=links, db_path=None, fetch_engine=None, cache=None, extractor="fast"):
+        self.links = dict(links)
+        self.extract = get_extractor(extractor)
+        compile_profiles()
+        self.db_path = db.resolve_db_path(db_path)
+        # The crawler owns its engine, so closing it leaves the shared one alone
+        self.engine = fetch_engine or FetchEngine(max_concurrency=8, per_host=2, timeout=10)
+        self.cache = HttpCache() if cache is None else cache or None
+        self._store = None
+        self._stop = threading.Event()
+
+    @property
+    def store(self):
+        """The crawler's database writer, opened on first use."""
+        if self._store is None:
+            self._store = data_base.TitleStore(self.db_path)
+        return self._store
+
+    def run_once(self):
+        """Scrape every outlet once and save the titles found.
+        Returns:
+            dict: "titles" maps each outlet to the number of new titles saved (None
+            if the page failed, "unchanged" if it was skipped) and "cache"
+            holds the cache hit/miss counters of this run."""
+        
+        titles_summary = {}
+        if self.cache:
+            self.cache.reset_counters()
+        # Download every outlet at once, so a slow portal doesn't hold up the others
+        pages = self.engine.fetch_all(self.links.values(), cache=self.cache)
+        found = {}
+        # url -> cache entry, committed only once the titles of the run are saved
+        entries = {}
+        for key, url in self.links.items():
+            html = pages[url]
+            if html is NOT_MODIFIED:
+                self.cache.record_not_modified(url)
+            elif html and self.cache:
+                html, entries[url] = html
+                if not self.cache.check(url, entries[url]):
+                    html = NOT_MODIFIED
+            if html is NOT_MODIFIED:
+                # Same page as last run: nothing new to parse or store
+                print(f"The page {key} has not changed since the last scraping")
+                titles_summary[key] = "unchanged"
+                continue
+            if not html:
+                titles_summary[key] = None
+                continue
+            titles = self.extract(html, key)
+            if not titles and key in PROFILES:
+                # The outlet's selectors found nothing: its markup most likely changed
+                print(f"The profile of page {key} found no titles, check its selectors in profiles.py")
+                titles = self.extract(html)
+                # Not committed to the cache, so the page is parsed again on the next run
+                entries.pop(url, None)
+            if titles:
+                print(f"The scraping of page {key} was successful")
+                print(f"Number of titles found: {len(titles)}")
+                found[key] = titles
+            else:
+                print(f"No titles found on page {key}")
+            titles_summary[key] = 0
+
+        # Every outlet of the run is saved in a single transaction
+        if found:
+            for key, saved in self.store.save_many(found).items():
+                print(f"New titles saved for {key}: {saved}")
+                titles_summary[key] = saved
+
+        summary = {"titles": titles_summary, "cache": None}
+        if self.cache:
+            # If the save failed, nothing is committed and the next run parses the pages again
+            for url, entry in entries.items():
+                self.cache.commit(url, entry)
+            self.cache.save()
+            summary["cache"] = counters = self.cache.counters()
+            print(
+                f"Cache: {counters['hits']} hits ({counters['not_modified']} not modified, "
+                f"{counters['same_content']} same content), {counters['misses']} misses"
+            )
+        return summary
+
+    def run_forever(self, interval, jitter=0, max_cycles=None):
+        """Run `run_once` every `interval` seconds until `stop` is called.
+        Args:
+            interval (float): Seconds between the start of two runs.
+            jitter (float): Up to this many seconds are randomly added to or
+                removed from each wait, so runs don't hit the portals at fixed times.
+            max_cycles (int): Stop after this many runs (None runs forever)."""
+        
+        cycles = 0
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self.run_once()
+            except Exception as e:
+                # A failed cycle must not kill the daemon
+                print(f"An error occurred during the scraping cycle: {e}")
+            cycles += 1
+            if max_cycles is not None and cycles >= max_cycles:
+                break
+            wait = interval + random.uniform(-jitter, jitter) - (time.monotonic() - started)
+            self._stop.wait(max(wait, 0))
+
+    def stop(self):
+        """Ask a running `run_forever` loop to finish after the current run."""
+        self._stop.set()
+
+    def close(self):
+        """Close the database writer and the HTTP engine."""
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+        self.engine.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape the headlines of the news portals.")
+    parser.add_argument("--daemon", action="store_true", help="keep running and scrape on a schedule")
+    parser.add_argument("--interval", type=float, default=3600, help="seconds between runs in daemon mode")
+    parser.add_argument("--jitter", type=float, default=300, help="random seconds added or removed from each wait")
+    parser.add_argument("--no-cache", action="store_true", help="download and parse every page even if it has not changed")
+    db.add_db_argument(parser)
+    parser.add_argument("--extractor", choices=sorted(EXTRACTORS), default="fast", help="headline extractor backend")
+    args = parser.parse_args(argv)
+
+    with Crawler(db_path=args.db, cache=False if args.no_cache else None, extractor=args.extractor) as crawler:
+        if not args.daemon:
+            crawler.run_once()
+            return
+        # Finish the current run cleanly on Ctrl+C or a termination signal
+        signal.signal(signal.SIGTERM, lambda *_: crawler.stop())
+        try:
+            crawler.run_forever(args.interval, args.jitter)
+        except KeyboardInterrupt:
+            crawler.stop()
+
+
+if __name__ == "__main__":
+    main()
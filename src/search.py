@@ -0,0 +1,119 @@
+import re
+from datetime import date, datetime, time, timedelta
+import db
+
+# Full-text search over the scraped titles, through the titles_fts index
+# (migration 5). Matching is by words, accent and case insensitive.
+
+TERM = re.compile(r"\w+\*?")
+
+
+def match_query(text):
+    """Turn free text into an FTS5 query: every word must appear, in any order.
+    Words are quoted, so punctuation or FTS5 operators in `text` can't break the
+    query; a trailing * keeps prefix matching ("infla*" finds "inflación").
+    Args:
+        text (str): What the user typed.
+    Returns:
+        str: The MATCH expression, or "" if `text` has no words."""
+    terms = []
+    for term in TERM.findall(text):
+        prefix = term.endswith("*")
+        terms.append(f'"{term.rstrip("*")}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+def any_of_query(words):
+    """Return an FTS5 query matching titles that contain any of `words` (each one as a phrase)."""
+    phrases = (" ".join(TERM.findall(word)) for word in words)
+    return " OR ".join(f'"{phrase}"' for phrase in phrases if phrase)
+
+
+def _epoch(day, end=False):
+    """Local midnight of `day` (or of the next day if `end`) as seconds since the epoch."""
+    if isinstance(day, str):
+        day = date.fromisoformat(day[:10])
+    elif isinstance(day, datetime):
+        day = day.date()
+    if end:
+        day += timedelta(days=1)
+    return int(datetime.combine(day, time()).timestamp())
+
+
+def _filters(media=None, date_range=None):
+    """Return the extra WHERE clauses and parameters for the media and date filters."""
+    clauses, params = [], []
+    if media:
+        media = [media] if isinstance(media, str) else list(media)
+        clauses.append(f"m.name IN ({', '.join('?' * len(media))})")
+        params.extend(media)
+    if date_range:
+        start, end = date_range
+        if start is not None:
+            clauses.append("t.scraped_at >= ?")
+            params.append(_epoch(start))
+        if end is not None:
+            clauses.append("t.scraped_at < ?")
+            params.append(_epoch(end, end=True))
+    return "".join(f" AND {clause}" for clause in clauses), params
+
+
+def search(query, media=None, date_range=None, limit=100, db_path=None):
+    """Search the titles, best matches first.
+    Args:
+        query (str): Words to look for (see `match_query`).
+        media (str | list): Only titles of this news portal (or these ones).
+        date_range (tuple): (start, end) days, both included; either can be None.
+            Days are dates or "YYYY-MM-DD" strings.
+        limit (int): Maximum number of results.
+        db_path (str | Path): The database file (see `db.resolve_db_path`).
+    Returns:
+        list: One dict per title with "media", "title" and "date" (day/month/year)."""
+    expression = match_query(query)
+    if not expression:
+        return []
+    where, params = _filters(media, date_range)
+    with db.get_database(db_path).read() as conn:
+        rows = conn.execute(f"""
+            SELECT m.name, t.title, STRFTIME('%d/%m/%Y', t.scraped_at, 'unixepoch', 'localtime')
+            FROM titles_fts
+            JOIN titles t ON t.id = titles_fts.rowid
+            JOIN media m ON m.id = t.media_id
+            WHERE titles_fts MATCH ?{where}
+            ORDER BY titles_fts.rank
+            LIMIT ?
+        """, [expression, *params, limit]).fetchall()
+    return [{"media": media, "title": title, "date": day} for media, title, day in rows]
+
+
+def count_matches(conn, expression, media=None, date_range=None):
+    """Return {media name: number of titles matching the FTS5 `expression`}."""
+    where, params = _filters(media, date_range)
+    rows = conn.execute(f"""
+        SELECT m.name, COUNT(*)
+        FROM titles_fts
+        JOIN titles t ON t.id = titles_fts.rowid
+        JOIN media m ON m.id = t.media_id
+        WHERE titles_fts MATCH ?{where}
+        GROUP BY t.media_id
+    """, [expression, *params])
+    return dict(rows.fetchall())
+
+
+def keyword_counts(conn, keywords):
+    """Count the titles of every label with one indexed query per label.
+    Unlike the keyword matcher, which finds substrings ("ley" inside "leyenda"),
+    the index matches whole words, with accents folded.
+    Args:
+        conn (sqlite3.Connection): A connection to the database.
+        keywords (dict): Label -> list of keywords (see `clear_stats.keyword_lists`).
+    Returns:
+        dict: (media name, label) -> count."""
+    counts = {}
+    for label, words in keywords.items():
+        expression = any_of_query(words)
+        if not expression:
+            continue
+        for media, n in count_matches(conn, expression).items():
+            counts[media, label] = n
+    return counts
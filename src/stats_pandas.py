@@ -0,0 +1,84 @@
+import re
+from aggregates import FIRST_OF_STORY
+from normalize import fold_title
+
+# Vectorized stats backend: the titles are loaded into a DataFrame and every
+# category / keyword group is one compiled-regex pass over the whole column.
+# It reads title_norm, folded at insert time, so no per-run normalization.
+# pandas is only imported when this backend is used. With pyarrow installed
+# the regex passes run in Arrow (RE2) instead of Python's re, ~10x faster.
+
+
+def keyword_patterns(keywords, fold=fold_title):
+    """Compile one regex per label matching any of its keywords, folded like the text.
+    Args:
+        keywords (dict): Label -> list of keywords (see `clear_stats.keyword_lists`).
+        fold (callable): Applied to every keyword, the same fold the text gets.
+    Returns:
+        dict: Label -> compiled pattern."""
+    patterns = {}
+    for label, words in keywords.items():
+        words = sorted({fold(word) for word in words if word}, key=len, reverse=True)
+        # A pattern that never matches when the list is empty
+        patterns[label] = re.compile("|".join(map(re.escape, words)) or r"[^\s\S]")
+    return patterns
+
+
+def load_titles(conn, unique_stories=False):
+    """Read every title into a DataFrame with a categorical `news_media` column, in id order.
+    With `unique_stories`, only the first title of each story in each outlet."""
+    import pandas as pd
+
+    df = pd.read_sql_query(f"""
+        SELECT m.name AS news_media, t.title_norm
+        FROM titles t JOIN media m ON m.id = t.media_id
+        {f"WHERE {FIRST_OF_STORY}" if unique_stories else ""}
+        ORDER BY t.id
+    """, conn)
+    # Categories in order of first appearance, the media order of the report
+    df["news_media"] = pd.Categorical(df["news_media"], categories=df["news_media"].unique())
+    return df
+
+
+def membership(df, patterns):
+    """Return a boolean DataFrame with one column per label: does the title contain one of its keywords."""
+    import pandas as pd
+
+    folded = df["title_norm"]
+    try:
+        folded = folded.astype("string[pyarrow]")
+    except ImportError:
+        return pd.DataFrame({label: folded.str.contains(pattern) for label, pattern in patterns.items()})
+    return pd.DataFrame({
+        label: folded.str.contains(pattern.pattern).to_numpy(dtype=bool)
+        for label, pattern in patterns.items()
+    }, index=df.index)
+
+
+def summary(df, patterns):
+    """Count the titles of each label per media.
+    Returns:
+        pandas.DataFrame: Indexed by media, with a "total" column and one
+            count column per label (the report computes the percentages)."""
+    flags = membership(df, patterns)
+    grouped = flags.groupby(df["news_media"], observed=True, sort=False)
+    counts = grouped.sum()
+    counts.insert(0, "total", grouped.size())
+    return counts
+
+
+def counts(conn, keywords, unique_stories=False):
+    """Classify every title with the vectorized backend.
+    Args:
+        conn (sqlite3.Connection): A connection to the database.
+        keywords (dict): Label -> list of keywords.
+        unique_stories (bool): Count stories instead of titles (see `load_titles`).
+    Returns:
+        dict: (media name, metric) -> count, like `aggregates.count_metrics`."""
+    table = summary(load_titles(conn, unique_stories), keyword_patterns(keywords))
+    metrics = ["total", *keywords]
+    return {
+        (media, metric): int(row[metric])
+        for media, row in table[metrics].iterrows()
+        for metric in metrics
+    }